@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Measure CLI cold-start time for digest-only and ingest-only runs."""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def time_command(cmd: list[str], runs: int) -> list[float]:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, cwd=REPO_ROOT, check=True, capture_output=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark v0.run cold start.")
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        db_path = tmp_path / "alpha.db"
+        input_path = tmp_path / "posts.jsonl"
+        input_path.write_text(
+            json.dumps({"post_id": "1", "text": "$AAPL long 180, stop 176, target 190"}) + "\n",
+            encoding="utf-8",
+        )
+
+        cases = {
+            "import v0.run": [sys.executable, "-c", "import v0.run"],
+            "digest": [
+                sys.executable,
+                "-m",
+                "v0.run",
+                "digest",
+                "--db",
+                str(db_path),
+                "--digest-out",
+                str(tmp_path / "digest.md"),
+            ],
+            "ingest": [
+                sys.executable,
+                "-m",
+                "v0.run",
+                "ingest",
+                "--db",
+                str(db_path),
+                "--input",
+                str(input_path),
+            ],
+        }
+
+        # First run creates and migrates the DB so later runs measure the steady state.
+        subprocess.run(cases["digest"], cwd=REPO_ROOT, check=True, capture_output=True)
+
+        for name, cmd in cases.items():
+            timings = time_command(cmd, args.runs)
+            print(
+                f"{name:<14} min {min(timings):7.1f} ms  "
+                f"median {statistics.median(timings):7.1f} ms  ({args.runs} runs)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Load-test a running `v0.run serve` instance with concurrent digest requests."""
+
+import argparse
+import statistics
+import threading
+import time
+import urllib.request
+from urllib.error import HTTPError
+
+
+def worker(url: str, requests: int, revalidate: bool, latencies: list[float]) -> None:
+    etag = None
+    for _ in range(requests):
+        request = urllib.request.Request(url)
+        if revalidate and etag:
+            request.add_header("If-None-Match", etag)
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+                etag = response.headers.get("ETag")
+        except HTTPError as err:
+            if err.code != 304:
+                raise
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the digest HTTP service.")
+    parser.add_argument("--url", default="http://127.0.0.1:8080/digest.md?hours=12")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=250, help="Requests per client.")
+    parser.add_argument("--revalidate", action="store_true", help="Send If-None-Match.")
+    args = parser.parse_args()
+
+    latencies: list[float] = []
+    threads = [
+        threading.Thread(target=worker, args=(args.url, args.requests, args.revalidate, latencies))
+        for _ in range(args.clients)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(
+        f"{len(latencies)} requests in {elapsed:.2f}s ({len(latencies) / elapsed:.0f} req/s); "
+        f"median {statistics.median(latencies):.2f} ms, "
+        f"p99 {latencies[int(len(latencies) * 0.99) - 1]:.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
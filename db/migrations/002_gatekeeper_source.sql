@@ -0,0 +1,2 @@
+-- Where gatekeeper_json came from: 'stage0', 'rules', 'classifier', 'llm' or 'audit' (NULL for rows labelled before this column).
+ALTER TABLE raw_posts ADD COLUMN gatekeeper_source TEXT;
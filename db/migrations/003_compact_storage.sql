@@ -0,0 +1,9 @@
+-- Label legacy gatekeeper rows so readers never have to sniff (possibly compressed) JSON.
+UPDATE raw_posts
+SET gatekeeper_source = CASE WHEN gatekeeper_json LIKE '%"skipped"%' THEN 'stage0' ELSE 'llm' END
+WHERE gatekeeper_json IS NOT NULL AND gatekeeper_source IS NULL;
+
+-- alpha_objects.alpha_json is the single copy of each alpha object.
+UPDATE raw_posts
+SET alpha_json = NULL
+WHERE alpha_json IS NOT NULL AND post_id IN (SELECT post_id FROM alpha_objects);
@@ -0,0 +1,3 @@
+-- Which analyst tier produced each alpha object, and why it was escalated (JSON list).
+ALTER TABLE alpha_objects ADD COLUMN analyst_model TEXT;
+ALTER TABLE alpha_objects ADD COLUMN escalation_reasons TEXT;
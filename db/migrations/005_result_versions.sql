@@ -0,0 +1,3 @@
+-- Hash of the prompt, schema and model behind each LLM result (see pipeline.stage_version).
+ALTER TABLE raw_posts ADD COLUMN gatekeeper_version TEXT;
+ALTER TABLE alpha_objects ADD COLUMN alpha_version TEXT;
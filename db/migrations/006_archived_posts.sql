@@ -0,0 +1,8 @@
+-- Tombstones for posts moved to a monthly cold DB, so dedupe and point reads still see them.
+CREATE TABLE IF NOT EXISTS archived_posts (
+  post_id TEXT PRIMARY KEY,
+  text_hash TEXT,
+  archive_path TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_archived_posts_text_hash ON archived_posts(text_hash);
@@ -0,0 +1,26 @@
+-- Change counters for alpha_objects, bumped by triggers so readers can poll them in O(1).
+-- INSERT OR REPLACE only fires the insert trigger (recursive_triggers is off), so
+-- `deletes` moves only when rows really disappear (archive, reprocess) or are edited.
+CREATE TABLE IF NOT EXISTS alpha_changes (
+  id INTEGER PRIMARY KEY CHECK (id = 1),
+  inserts INTEGER NOT NULL,
+  deletes INTEGER NOT NULL
+);
+
+INSERT OR IGNORE INTO alpha_changes (id, inserts, deletes)
+VALUES (1, (SELECT COUNT(*) FROM alpha_objects), 0);
+
+CREATE TRIGGER IF NOT EXISTS alpha_objects_changes_insert AFTER INSERT ON alpha_objects
+BEGIN
+  UPDATE alpha_changes SET inserts = inserts + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS alpha_objects_changes_delete AFTER DELETE ON alpha_objects
+BEGIN
+  UPDATE alpha_changes SET deletes = deletes + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS alpha_objects_changes_update AFTER UPDATE ON alpha_objects
+BEGIN
+  UPDATE alpha_changes SET deletes = deletes + 1 WHERE id = 1;
+END;
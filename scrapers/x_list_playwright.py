@@ -10,6 +10,9 @@ from dotenv import load_dotenv
 from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 from playwright.sync_api import sync_playwright
 
+from v0 import trace
+from v0.trace import span, traced
+
 
 def normalize_list_url(list_id_or_url: str) -> str:
     if list_id_or_url.startswith("http"):
@@ -204,6 +207,7 @@ def add_members_to_list(
     print(f"Added {added}/{len(cleaned)} accounts.")
 
 
+@traced("scrape")
 def scrape_list(
     list_url: str,
     storage_state_path: Path,
@@ -220,66 +224,70 @@ def scrape_list(
     rows: list[dict] = []
 
     with sync_playwright() as playwright:
-        browser = playwright.chromium.launch(headless=headless, slow_mo=slow_mo)
-        context = browser.new_context(storage_state=str(storage_state_path))
-        page = context.new_page()
-        page.goto(list_url, wait_until="domcontentloaded")
-        page.wait_for_selector('article[data-testid="tweet"]', timeout=60000)
+        with span("scrape.load"):
+            browser = playwright.chromium.launch(headless=headless, slow_mo=slow_mo)
+            context = browser.new_context(storage_state=str(storage_state_path))
+            page = context.new_page()
+            page.goto(list_url, wait_until="domcontentloaded")
+            page.wait_for_selector('article[data-testid="tweet"]', timeout=60000)
 
         newest_id = since_id
         scrolls = 0
 
         while len(rows) < max_posts and scrolls < max_scrolls:
-            articles = page.locator('article[data-testid="tweet"]')
-            for idx in range(articles.count()):
-                article = articles.nth(idx)
-                link = article.locator("a[href*='/status/']").first
-                href = link.get_attribute("href") if link else None
-                url = f"https://x.com{href}" if href and href.startswith("/") else href
-                post_id = parse_post_id(url)
-                if not post_id or post_id in seen:
-                    continue
-                if since_id and int(post_id) <= int(since_id):
-                    continue
-
-                text_locator = article.locator("div[data-testid='tweetText']")
-                text = text_locator.inner_text() if text_locator.count() else ""
-                time_locator = article.locator("time")
-                created_at = (
-                    time_locator.get_attribute("datetime") if time_locator.count() else None
-                )
-                username = None
-                if url:
-                    match = re.search(r"x\\.com/([^/]+)/status", url)
-                    username = match.group(1) if match else None
-
-                row = {
-                    "post_id": post_id,
-                    "url": url,
-                    "username": username,
-                    "text": text,
-                    "created_at": created_at,
-                    "scraped_at": datetime.now(timezone.utc).isoformat(),
-                    "list_url": list_url,
-                }
-                rows.append(row)
-                seen.add(post_id)
-
-                if newest_id is None or int(post_id) > int(newest_id):
-                    newest_id = post_id
-
-                if len(rows) >= max_posts:
-                    break
+            with span("scrape.extract"):
+                articles = page.locator('article[data-testid="tweet"]')
+                for idx in range(articles.count()):
+                    article = articles.nth(idx)
+                    link = article.locator("a[href*='/status/']").first
+                    href = link.get_attribute("href") if link else None
+                    url = f"https://x.com{href}" if href and href.startswith("/") else href
+                    post_id = parse_post_id(url)
+                    if not post_id or post_id in seen:
+                        continue
+                    if since_id and int(post_id) <= int(since_id):
+                        continue
+
+                    text_locator = article.locator("div[data-testid='tweetText']")
+                    text = text_locator.inner_text() if text_locator.count() else ""
+                    time_locator = article.locator("time")
+                    created_at = (
+                        time_locator.get_attribute("datetime") if time_locator.count() else None
+                    )
+                    username = None
+                    if url:
+                        match = re.search(r"x\\.com/([^/]+)/status", url)
+                        username = match.group(1) if match else None
+
+                    row = {
+                        "post_id": post_id,
+                        "url": url,
+                        "username": username,
+                        "text": text,
+                        "created_at": created_at,
+                        "scraped_at": datetime.now(timezone.utc).isoformat(),
+                        "list_url": list_url,
+                    }
+                    rows.append(row)
+                    seen.add(post_id)
+
+                    if newest_id is None or int(post_id) > int(newest_id):
+                        newest_id = post_id
+
+                    if len(rows) >= max_posts:
+                        break
 
-            page.mouse.wheel(0, 1800)
-            page.wait_for_timeout(1200)
+            with span("scrape.scroll"):
+                page.mouse.wheel(0, 1800)
+                page.wait_for_timeout(1200)
             scrolls += 1
 
         context.close()
         browser.close()
 
     if rows:
-        write_jsonl(out_path, rows)
+        with span("scrape.write"):
+            write_jsonl(out_path, rows)
         state.update({"since_id": newest_id, "last_run": datetime.now(timezone.utc).isoformat()})
         save_state(state_path, state)
 
@@ -323,6 +331,15 @@ def main() -> None:
     parser.add_argument("--storage-state", default=".runtime/x_storage_state.json")
     parser.add_argument("--out", default="data/x_posts.jsonl")
     parser.add_argument("--state", default="data/x_scrape_state.json")
+    parser.add_argument("--trace-out", help="Write the scrape timing breakdown as JSON.")
+    parser.add_argument(
+        "--profile",
+        action="append",
+        default=[],
+        metavar="STAGE",
+        help="Run a stage (e.g. scrape, scrape.extract) under cProfile; repeatable.",
+    )
+    parser.add_argument("--profile-dir", default="data/profiles", help="Where .prof files go.")
     args = parser.parse_args()
 
     storage_state_path = Path(args.storage_state)
@@ -364,6 +381,7 @@ def main() -> None:
         )
         return
 
+    trace.enable_profiling(args.profile)
     scrape_list(
         list_url=list_url,
         storage_state_path=storage_state_path,
@@ -374,6 +392,11 @@ def main() -> None:
         headless=args.headless,
         slow_mo=args.slow_mo,
     )
+    print(trace.format_summary())
+    if args.trace_out:
+        trace.export_json(Path(args.trace_out))
+    for path in trace.dump_profiles(Path(args.profile_dir)):
+        print(f"Wrote profile to {path} (inspect with `python -m pstats {path}`).")
 
 
 if __name__ == "__main__":
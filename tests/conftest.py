@@ -0,0 +1,67 @@
+import time
+from collections.abc import Callable, Iterator
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from v0.db import connect, init_db, insert_raw_post, update_alpha
+
+
+def iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat()
+
+
+@pytest.fixture
+def db_path(tmp_path: Path) -> str:
+    return str(tmp_path / "alpha.db")
+
+
+@pytest.fixture
+def conn(db_path: str) -> Iterator:
+    conn = connect(db_path)
+    init_db(conn)
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def add_post(conn) -> Callable[..., str]:
+    """Insert a raw post (and an alpha object unless `alpha=False`) `age_hours` old."""
+
+    def add(
+        post_id: str,
+        asset: str = "AAPL",
+        stance: str = "bullish",
+        age_hours: float = 1.0,
+        username: str | None = None,
+        text: str | None = None,
+        alpha: bool = True,
+    ) -> str:
+        created_at = iso(time.time() - age_hours * 3600)
+        insert_raw_post(
+            conn,
+            {
+                "post_id": post_id,
+                "username": username or f"user{post_id}",
+                "text": text or f"${asset} {stance} {post_id}",
+                "created_at": created_at,
+                "url": f"https://x.com/user{post_id}/status/{post_id}",
+            },
+        )
+        if alpha:
+            update_alpha(
+                conn,
+                post_id,
+                {
+                    "assets": [asset],
+                    "stance": stance,
+                    "timeframe": "swing",
+                    "extraction_confidence": "high",
+                    "rationale_bullets": [f"{stance} {post_id}"],
+                },
+                created_at,
+            )
+        return post_id
+
+    return add
@@ -0,0 +1,80 @@
+import math
+
+from v0.aggregate import AggregationEngine, AssetStats
+from v0.db import delete_alpha
+
+
+def assert_same_stats(got: dict[str, AssetStats], want: dict[str, AssetStats]) -> None:
+    assert got.keys() == want.keys()
+    for asset, stats in want.items():
+        for name, value in vars(stats).items():
+            other = getattr(got[asset], name)
+            if isinstance(value, float) and math.isnan(value):
+                assert math.isnan(other), (asset, name)
+            else:
+                assert other == value or math.isclose(other, value), (asset, name)
+
+
+def fresh_stats(conn, hours: float = 12) -> dict[str, AssetStats]:
+    engine = AggregationEngine(conn)
+    engine.refresh()
+    return engine.stats(hours)
+
+
+def test_incremental_refresh_matches_rebuild(conn, add_post):
+    add_post("1", "AAPL", "bullish", age_hours=1)
+    add_post("2", "AAPL", "bearish", age_hours=2)
+    engine = AggregationEngine(conn)
+    engine.refresh()
+    engine.stats(12)
+
+    add_post("3", "TSLA", "bullish", age_hours=3)
+    add_post("2", "AAPL", "bullish", age_hours=2)  # re-extraction replaces the row
+    assert engine.refresh() > 0
+    assert_same_stats(engine.stats(12), fresh_stats(conn))
+
+
+def test_refresh_rebuilds_after_delete_then_insert(conn, add_post):
+    add_post("1", "AAPL")
+    add_post("2", "TSLA")
+    engine = AggregationEngine(conn)
+    engine.refresh()
+    assert set(engine.stats(12)) == {"AAPL", "TSLA"}
+
+    delete_alpha(conn, "2")
+    add_post("3", "NVDA")
+    # SQLite hands the freed rowid to the next insert, so a rowid mark alone misses it.
+    reused = conn.execute("SELECT rowid FROM alpha_objects WHERE post_id='3'").fetchone()[0]
+    assert reused == 2
+
+    engine.refresh()
+    assert set(engine.stats(12)) == {"AAPL", "NVDA"}
+    assert_same_stats(engine.stats(12), fresh_stats(conn))
+
+
+def test_refresh_without_changes_is_a_no_op(conn, add_post):
+    add_post("1")
+    engine = AggregationEngine(conn)
+    assert engine.refresh() == 1
+    assert engine.refresh() == 0
+
+
+def test_stats_cache_keeps_latest_bucket_per_window(conn, add_post):
+    add_post("1")
+    engine = AggregationEngine(conn, max_windows=4)
+    engine.refresh()
+    for minute in range(100):
+        engine.stats(12, as_of=1_700_000_000 + 60 * minute)
+    assert len(engine._cache) == 1
+    for hours in range(1, 10):
+        engine.stats(hours)
+    assert len(engine._cache) == 4
+
+
+def test_history_bound_matches_full_engine(conn, add_post):
+    add_post("1", "AAPL", "bullish", age_hours=1)
+    add_post("2", "AAPL", "bearish", age_hours=15)  # previous window, used by momentum
+    add_post("3", "AAPL", "bearish", age_hours=100)
+    bounded = AggregationEngine(conn, history_hours=24)
+    assert bounded.refresh() == 2
+    assert_same_stats(bounded.stats(12), fresh_stats(conn))
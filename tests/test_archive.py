@@ -0,0 +1,87 @@
+import json
+
+from v0.archive import archive_rows, compact_db
+from v0.db import (
+    COMPRESSED_PREFIX,
+    connect,
+    fetch_gatekeeper,
+    fetch_raw_post,
+    insert_raw_post,
+    text_hash_exists,
+    update_gatekeeper,
+)
+
+
+def count(conn, table: str) -> int:
+    return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_archive_moves_old_posts_and_leaves_tombstones(conn, add_post, tmp_path):
+    add_post("old", age_hours=24 * 60)
+    add_post("new", age_hours=1)
+    gate = {"is_finance_relevant": True, "primary_assets_detected": ["AAPL"]}
+    update_gatekeeper(conn, "old", gate, "llm", "v1")
+    conn.execute("UPDATE raw_posts SET text_hash='h-old' WHERE post_id='old'")
+    conn.commit()
+    old_post = fetch_raw_post(conn, "old")
+
+    moved = archive_rows(conn, tmp_path / "archive", retention_days=30)
+
+    assert sum(moved.values()) == 1
+    assert [row["post_id"] for row in conn.execute("SELECT post_id FROM raw_posts")] == ["new"]
+    assert count(conn, "alpha_objects") == 1
+    (path,) = (tmp_path / "archive").glob("alpha-*.db")
+    cold = connect(str(path))
+    assert [row["post_id"] for row in cold.execute("SELECT post_id FROM raw_posts")] == ["old"]
+    assert count(cold, "alpha_objects") == 1
+    cold.close()
+
+    tombstone = conn.execute("SELECT * FROM archived_posts").fetchone()
+    assert tombstone["post_id"] == "old"
+    assert tombstone["archive_path"] == str(path.resolve())
+
+    # Reads follow the tombstone into the cold DB.
+    assert fetch_raw_post(conn, "old") == old_post
+    assert fetch_gatekeeper(conn, "old") == gate
+
+
+def test_archived_posts_stay_deduplicated(conn, add_post, tmp_path):
+    add_post("old", age_hours=24 * 60, alpha=False)
+    conn.execute("UPDATE raw_posts SET text_hash='h-old' WHERE post_id='old'")
+    conn.commit()
+    archive_rows(conn, tmp_path / "archive", retention_days=30)
+
+    assert text_hash_exists(conn, "h-old")
+    assert not insert_raw_post(conn, {"post_id": "old", "text": "again", "text_hash": "h2"})
+    assert count(conn, "raw_posts") == 0
+
+
+def test_archive_without_old_posts_is_a_no_op(conn, add_post, tmp_path):
+    add_post("new", age_hours=1)
+    assert archive_rows(conn, tmp_path / "archive", retention_days=30) == {}
+    assert not (tmp_path / "archive").exists()
+    assert count(conn, "archived_posts") == 0
+
+
+def test_compact_rewrites_plain_rows_in_batches(conn):
+    for i in range(7):
+        conn.execute(
+            "INSERT INTO raw_posts (post_id, text, raw_json, gatekeeper_json) VALUES (?, ?, ?, ?)",
+            (
+                str(i),
+                f"post {i}",
+                json.dumps({"post_id": str(i), "like_count": i}),
+                json.dumps({"is_finance_relevant": bool(i % 2)}) if i != 3 else None,
+            ),
+        )
+    conn.commit()
+    insert_raw_post(conn, {"post_id": "done", "text": "x", "like_count": 1})
+
+    assert compact_db(conn, vacuum=False, batch_size=3) == 7
+    for i in range(7):
+        assert fetch_raw_post(conn, str(i))["like_count"] == i
+        gate = fetch_gatekeeper(conn, str(i))
+        assert gate == (None if i == 3 else {"is_finance_relevant": bool(i % 2)})
+    blobs = conn.execute("SELECT raw_json FROM raw_posts").fetchall()
+    assert all(row[0].startswith(COMPRESSED_PREFIX) for row in blobs)
+    assert compact_db(conn, vacuum=False, batch_size=3) == 0
@@ -0,0 +1,99 @@
+import json
+import zlib
+
+import pytest
+
+from v0.db import (
+    COMPRESSED_PREFIX,
+    JSON_ZDICT,
+    _split_statements,
+    decode_json,
+    encode_json,
+    fetch_gatekeeper,
+    fetch_raw_post,
+    insert_raw_post,
+    update_gatekeeper,
+)
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        {},
+        {"skipped": True, "reason": "stage0"},
+        {
+            "is_finance_relevant": True,
+            "is_actionable_trade_idea": False,
+            "primary_assets_detected": ["$AAPL", "BTC"],
+            "reason_code": "single_name",
+        },
+        {"text": "ünïcödé 📈", "nested": {"list": [1, 2.5, None, "x"]}},
+        [1, "two", None],
+        None,
+    ],
+)
+def test_encode_decode_round_trip(value):
+    encoded = encode_json(value)
+    assert encoded.startswith(COMPRESSED_PREFIX)
+    assert decode_json(encoded) == value
+
+
+def test_encode_uses_preset_dictionary():
+    value = {"is_finance_relevant": False, "primary_assets_detected": []}
+    body = encode_json(value)[len(COMPRESSED_PREFIX) :]
+    with pytest.raises(zlib.error):
+        zlib.decompress(body)
+    decompressor = zlib.decompressobj(zdict=JSON_ZDICT)
+    assert json.loads(decompressor.decompress(body)) == value
+
+
+def test_decode_reads_legacy_plain_text():
+    value = {"is_finance_relevant": True, "reason_code": "macro"}
+    assert decode_json(json.dumps(value)) == value
+    assert decode_json(json.dumps(value).encode("utf-8")) == value
+    assert decode_json(None) is None
+
+
+def test_raw_post_round_trip(conn):
+    row = {
+        "post_id": "1",
+        "id": "1",
+        "url": "https://x.com/a/status/1",
+        "username": "a",
+        "text": "$AAPL long",
+        "created_at": "2024-01-02T03:04:05+00:00",
+        "scraped_at": None,
+        "text_hash": "h1",
+        "like_count": 7,
+        "list_url": "https://x.com/i/lists/9",
+    }
+    assert insert_raw_post(conn, row)
+    assert not insert_raw_post(conn, row)
+
+    post = fetch_raw_post(conn, "1")
+    assert post == {key: value for key, value in row.items() if key != "id"}
+    stored = conn.execute("SELECT raw_json FROM raw_posts WHERE post_id='1'").fetchone()[0]
+    assert stored.startswith(COMPRESSED_PREFIX)
+
+
+def test_gatekeeper_round_trip(conn):
+    insert_raw_post(conn, {"post_id": "1", "text": "x", "text_hash": "h1"})
+    gate = {"is_finance_relevant": True, "primary_assets_detected": ["AAPL"]}
+    update_gatekeeper(conn, "1", gate, "llm", "v1")
+    assert fetch_gatekeeper(conn, "1") == gate
+    assert fetch_gatekeeper(conn, "missing") is None
+
+
+def test_split_statements_keeps_trigger_bodies():
+    script = """
+    CREATE TABLE t (a INTEGER);
+    -- comment; with a semicolon
+    CREATE TRIGGER t_ai AFTER INSERT ON t BEGIN
+      UPDATE t SET a = a + 1;
+      SELECT 1;
+    END;
+    INSERT INTO t VALUES (1);
+    """
+    statements = _split_statements(script)
+    assert len(statements) == 3
+    assert "SELECT 1;" in statements[1]
@@ -0,0 +1,129 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from v0.cascade import CascadeStats, EscalationPolicy
+from v0.db import fetch_gatekeeper, fetch_stale_alpha, update_gatekeeper
+from v0.pipeline import LLMStages
+from v0.reprocess import reprocess
+from v0.rules import extract_cashtags
+
+
+class FakeLLM:
+    """Stands in for `structured_call`: routes every post and calls it bearish."""
+
+    def __init__(self, routes: bool = True):
+        self.routes = routes
+        self.calls: list[str] = []
+
+    def __call__(self, *, schema_name: str, user_text: str, **_) -> dict:
+        self.calls.append(schema_name)
+        if schema_name == "gatekeeper_result":
+            return {
+                "is_finance_relevant": self.routes,
+                "is_actionable_trade_idea": self.routes,
+                "has_media_worth_processing": False,
+                "primary_assets_detected": extract_cashtags(user_text),
+                "reason_code": "single_name",
+            }
+        return {
+            "assets": extract_cashtags(user_text),
+            "stance": "bearish",
+            "timeframe": "swing",
+            "extraction_confidence": "high",
+        }
+
+
+def make_stages(llm: FakeLLM) -> LLMStages:
+    return LLMStages(
+        client=None,
+        call=llm,
+        gate_model="gate",
+        gate_prompt="",
+        gate_schema={},
+        gate_version="gate-v2",
+        analyst_model="fast",
+        escalation_model=None,
+        alpha_prompt="",
+        alpha_schema={},
+        analyst_versions={"fast": "alpha-v2"},
+        policy=EscalationPolicy(),
+        stats=CascadeStats(),
+    )
+
+
+@pytest.fixture
+def versioned_posts(conn, add_post):
+    """Five alpha rows: current, old and unversioned, across two assets and ages."""
+    for post_id, asset, age_hours, version in [
+        ("current", "AAPL", 1, "alpha-v2"),
+        ("old", "AAPL", 1, "alpha-v1"),
+        ("unversioned", "AAPL", 1, None),
+        ("old-tsla", "TSLA", 1, "alpha-v1"),
+        ("old-aged", "AAPL", 48, "alpha-v1"),
+    ]:
+        add_post(post_id, asset, age_hours=age_hours)
+        conn.execute("UPDATE alpha_objects SET alpha_version=? WHERE post_id=?", (version, post_id))
+    conn.commit()
+
+
+def hours_ago(hours: float) -> str:
+    return (datetime.now(timezone.utc) - timedelta(hours=hours)).isoformat()
+
+
+def stale_ids(conn, **filters) -> set[str]:
+    return {row["post_id"] for row in fetch_stale_alpha(conn, ["alpha-v2"], **filters)}
+
+
+def test_stale_alpha_selection(conn, versioned_posts):
+    assert stale_ids(conn) == {"old", "unversioned", "old-tsla", "old-aged"}
+    since = hours_ago(24)
+    assert stale_ids(conn, since=since) == {"old", "unversioned", "old-tsla"}
+    assert stale_ids(conn, asset="TSLA") == {"old-tsla"}
+    assert stale_ids(conn, since=since, asset="AAPL") == {"old", "unversioned"}
+
+
+def test_dry_run_counts_without_calling_the_llm(conn, versioned_posts):
+    llm = FakeLLM()
+    report = reprocess(conn, make_stages(llm), since=hours_ago(24), dry_run=True)
+    assert report.selected == 3
+    assert report.reextracted == 0
+    assert llm.calls == []
+
+
+def test_reprocess_restamps_only_stale_rows(conn, versioned_posts):
+    llm = FakeLLM()
+    report = reprocess(conn, make_stages(llm), asset="AAPL", workers=2)
+
+    assert report.selected == report.reextracted == 3
+    assert report.changed == 3
+    assert report.field_changes["stance"] == 3
+    assert llm.calls == ["alpha_object_v2"] * 3
+    assert stale_ids(conn) == {"old-tsla"}
+    stances = dict(conn.execute("SELECT post_id, stance FROM alpha_objects"))
+    assert stances["current"] == "bullish"
+    assert stances["old"] == "bearish"
+
+
+def test_gatekeeper_reprocess_selects_llm_rows_and_keeps_their_source(conn, add_post):
+    gate = {"is_finance_relevant": True, "is_actionable_trade_idea": True}
+    for post_id, source, version in [
+        ("llm-old", "llm", "gate-v1"),
+        ("audit-old", "audit", None),
+        ("llm-current", "llm", "gate-v2"),
+        ("rules", "rules", None),
+        ("classifier", "classifier", None),
+    ]:
+        add_post(post_id, "AAPL")
+        update_gatekeeper(conn, post_id, gate, source, version)
+
+    report = reprocess(conn, make_stages(FakeLLM(routes=False)), stage="gatekeeper")
+
+    assert report.selected == report.reextracted == 2
+    assert report.routing_changed == 2
+    sources = dict(conn.execute("SELECT post_id, gatekeeper_source FROM raw_posts"))
+    assert sources["llm-old"] == "llm" and sources["audit-old"] == "audit"
+    assert fetch_gatekeeper(conn, "llm-old")["is_finance_relevant"] is False
+    # Posts that stop routing lose their alpha object.
+    remaining = {row[0] for row in conn.execute("SELECT post_id FROM alpha_objects")}
+    assert remaining == {"llm-current", "rules", "classifier"}
@@ -0,0 +1,109 @@
+import threading
+import time
+import urllib.request
+from http.server import ThreadingHTTPServer
+from urllib.error import HTTPError
+
+import pytest
+
+from v0 import server
+from v0.db import delete_alpha
+from v0.server import MAX_HOURS, DigestCache, etag_matches, make_handler
+
+
+@pytest.fixture
+def cache(conn, db_path):
+    return DigestCache(db_path, max_entries=4)
+
+
+def test_cache_hits_until_alpha_rows_change(cache, add_post):
+    add_post("1", "AAPL")
+    etag, body = cache.get("md", 12, None)
+    assert cache.get("md", 12, None) == (etag, body)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    add_post("2", "TSLA")
+    new_etag, new_body = cache.get("md", 12, None)
+    assert cache.misses == 2
+    assert b"TSLA" in new_body and new_etag != etag
+
+
+def test_cache_invalidates_on_delete_then_insert(cache, conn, add_post):
+    add_post("1", "AAPL")
+    add_post("2", "TSLA")
+    _, body = cache.get("json", 12, None)
+    assert b"TSLA" in body
+
+    # The new row reuses rowid 2 and the row count is unchanged.
+    delete_alpha(conn, "2")
+    add_post("3", "NVDA")
+    _, body = cache.get("json", 12, None)
+    assert cache.misses == 2
+    assert b"NVDA" in body and b"TSLA" not in body
+
+
+def test_etag_is_stable_across_time_buckets(cache, add_post, monkeypatch):
+    add_post("1", "AAPL", age_hours=1)
+    etag, body = cache.get("md", 12, None)
+
+    now = time.time() + cache.resolution_seconds
+    monkeypatch.setattr(server.time, "time", lambda: now)
+    assert cache.get("md", 12, None) == (etag, body)
+    assert cache.misses == 2
+
+
+def test_cache_is_bounded(cache, add_post):
+    add_post("1", "AAPL")
+    for hours in range(1, 10):
+        cache.get("md", hours, None)
+    assert len(cache.entries) == cache.max_entries
+
+
+@pytest.mark.parametrize(
+    ("header", "matches"),
+    [
+        (None, False),
+        ('"abc"', True),
+        ('W/"abc"', True),
+        ('"x", W/"abc"', True),
+        ('"x","y"', False),
+        ("*", True),
+        ("abc", False),
+    ],
+)
+def test_etag_matches(header, matches):
+    assert etag_matches(header, '"abc"') is matches
+
+
+@pytest.fixture
+def base_url(cache):
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(cache))
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def fetch(url: str, headers: dict[str, str] | None = None) -> tuple[int, dict, bytes]:
+    request = urllib.request.Request(url, headers=headers or {})
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, dict(response.headers), response.read()
+    except HTTPError as err:
+        return err.code, dict(err.headers), err.read()
+
+
+def test_http_revalidation_and_hours_bounds(base_url, add_post):
+    add_post("1", "AAPL")
+    status, headers, body = fetch(f"{base_url}/digest.md?hours=12")
+    assert status == 200 and b"AAPL" in body
+
+    etag = headers["ETag"]
+    status, _, _ = fetch(f"{base_url}/digest.md?hours=12", {"If-None-Match": f'"x", W/{etag}'})
+    assert status == 304
+
+    for hours in ("0", str(MAX_HOURS + 1), "9" * 30, "abc"):
+        status, _, _ = fetch(f"{base_url}/digest.md?hours={hours}")
+        assert status == 400, hours
+    assert fetch(f"{base_url}/digest.md?hours={MAX_HOURS}")[0] == 200
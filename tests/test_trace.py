@@ -0,0 +1,43 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from v0 import trace
+
+
+@pytest.fixture(autouse=True)
+def clean_trace():
+    trace.reset()
+    yield
+    trace._profile_stages.clear()
+    trace.reset()
+
+
+def work(n: int) -> int:
+    with trace.span("outer"):
+        with trace.span("inner"):
+            return sum(range(n))
+
+
+def test_spans_aggregate_by_path():
+    for _ in range(3):
+        work(10)
+    counts = {entry["name"]: entry["count"] for entry in trace.summary()["spans"]}
+    assert counts == {"outer": 3, "outer/inner": 3}
+
+
+def test_profiling_is_safe_across_threads(tmp_path):
+    trace.enable_profiling(["outer", "inner"])
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        assert list(pool.map(work, [10_000] * 64)) == [sum(range(10_000))] * 64
+
+    assert not trace._profiling.locked()
+    written = trace.dump_profiles(tmp_path / "profiles")
+    assert {path.name for path in written} <= {"outer.prof", "inner.prof"}
+    assert all(path.exists() for path in written)
+
+
+def test_dump_profiles_without_profiles_creates_nothing(tmp_path):
+    work(10)
+    assert trace.dump_profiles(tmp_path / "profiles") == []
+    assert not (tmp_path / "profiles").exists()
@@ -0,0 +1,264 @@
+"""Decay-weighted per-asset stance aggregation over `alpha_objects`.
+
+Every (post, asset) pair is one row in a set of parallel NumPy columns. Window
+statistics for all assets are computed at once with `np.bincount` over the
+asset codes, so the cost is linear in the number of rows regardless of how many
+assets there are.
+"""
+
+import json
+import math
+import sqlite3
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import numpy as np
+
+from v0.db import alpha_changes, fetch_alpha_rows, parse_timestamp
+
+STANCE_SCORES = {"bullish": 1.0, "bearish": -1.0, "neutral": 0.0}
+CONFIDENCE_WEIGHTS = {"low": 0.25, "medium": 0.6, "high": 1.0}
+HALF_LIFE_HOURS = {"2h": 2.0, "8h": 8.0, "24h": 24.0, "3d": 72.0, "7d": 168.0}
+# Fallback when the analyst leaves `time_decay_half_life` null.
+TIMEFRAME_HALF_LIFE_HOURS = {"intraday": 8.0, "swing": 72.0, "position": 168.0, "unknown": 24.0}
+UNMAPPED_ASSET = "(unmapped)"
+
+
+@dataclass
+class AssetStats:
+    asset: str
+    n_posts: int
+    n_authors: int
+    consensus: float
+    momentum: float
+    author_diversity: float
+
+
+def half_life_hours(alpha: dict[str, Any], timeframe: str | None) -> float:
+    bucket = alpha.get("time_decay_half_life")
+    if bucket in HALF_LIFE_HOURS:
+        return HALF_LIFE_HOURS[bucket]
+    return TIMEFRAME_HALF_LIFE_HOURS.get(timeframe or "unknown", 24.0)
+
+
+class AggregationEngine:
+    """Columnar store of alpha rows with per-window cached statistics.
+
+    `refresh()` appends only rows past the `alpha_objects` rowid high-water mark
+    and recomputes cached windows for the assets those rows touched. When the
+    `alpha_changes` delete counter moves (archive, reprocess), it rebuilds from scratch.
+    Only the newest time bucket of the `max_windows` most recent windows is cached.
+    A one-shot engine can pass `history_hours` to load only recent rows.
+    """
+
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        resolution_seconds: int = 60,
+        max_windows: int = 16,
+        history_hours: float | None = None,
+    ) -> None:
+        self.conn = conn
+        self.resolution_seconds = resolution_seconds
+        self.max_windows = max_windows
+        self.history_hours = history_hours
+        self._reset()
+
+    def _reset(self) -> None:
+        self.high_water = 0
+        self.changes: tuple[int, int] | None = None
+
+        self.asset_codes: dict[str, int] = {}
+        self.author_codes: dict[str, int] = {}
+        self.post_rows: dict[str, np.ndarray] = {}
+
+        self.asset = np.empty(0, dtype=np.int32)
+        self.author = np.empty(0, dtype=np.int32)
+        self.ts = np.empty(0, dtype=np.float64)
+        self.score = np.empty(0, dtype=np.float64)
+        self.scored = np.empty(0, dtype=bool)
+        self.weight = np.empty(0, dtype=np.float64)
+        self.half_life = np.empty(0, dtype=np.float64)
+        self.valid = np.empty(0, dtype=bool)
+
+        # window seconds -> (bucket, stats)
+        self._cache: OrderedDict[float, tuple[float, dict[str, AssetStats]]] = OrderedDict()
+
+    @property
+    def assets(self) -> list[str]:
+        return list(self.asset_codes)
+
+    def _code(self, codes: dict[str, int], key: str) -> int:
+        if key not in codes:
+            codes[key] = len(codes)
+        return codes[key]
+
+    def refresh(self) -> int:
+        """Load alpha rows added since the last refresh; return rows added."""
+        # Read the counters before fetching; a write racing the fetch shows on the next call.
+        changes = alpha_changes(self.conn)
+        if changes == self.changes:
+            return 0
+        if self.changes is not None and changes[1] != self.changes[1]:
+            # A delete frees rowids for reuse, so only a pure append is safe incrementally.
+            self._reset()
+        self.changes = changes
+        since = None
+        if self.history_hours is not None:
+            cutoff = datetime.now(timezone.utc) - timedelta(hours=self.history_hours)
+            since = cutoff.isoformat()
+        return self._append(fetch_alpha_rows(self.conn, self.high_water, since))
+
+    def _append(self, rows: list[sqlite3.Row]) -> int:
+        if not rows:
+            return 0
+
+        columns: dict[str, list] = {
+            "asset": [],
+            "author": [],
+            "ts": [],
+            "score": [],
+            "scored": [],
+            "weight": [],
+            "half_life": [],
+        }
+        new_posts: dict[str, list[int]] = {}
+        touched: set[int] = set()
+        base = len(self.ts)
+
+        for row in rows:
+            self.high_water = max(self.high_water, row["rowid"])
+
+            # INSERT OR REPLACE gives a re-extracted post a new rowid; retire the old rows.
+            post_id = row["post_id"]
+            if post_id in self.post_rows:
+                old = self.post_rows.pop(post_id)
+                self.valid[old] = False
+                touched.update(self.asset[old].tolist())
+            if post_id in new_posts:
+                for idx in new_posts.pop(post_id):
+                    columns["scored"][idx - base] = False
+                    columns["weight"][idx - base] = 0.0
+
+            indices: list[int] = []
+            new_posts[post_id] = indices
+            ts = parse_timestamp(row["created_at"])
+            if ts is None:
+                continue
+            alpha = json.loads(row["alpha_json"]) if row["alpha_json"] else {}
+            assets = json.loads(row["assets_json"]) if row["assets_json"] else []
+            author = row["username"] or (alpha.get("origin") or {}).get("username") or ""
+            stance = row["stance"] or "unclear"
+            hl = half_life_hours(alpha, row["timeframe"]) * 3600.0
+            weight = CONFIDENCE_WEIGHTS.get(row["extraction_confidence"] or "low", 0.25)
+
+            for asset in dict.fromkeys(assets or [UNMAPPED_ASSET]):
+                code = self._code(self.asset_codes, asset)
+                touched.add(code)
+                indices.append(base + len(columns["ts"]))
+                columns["asset"].append(code)
+                columns["author"].append(self._code(self.author_codes, author))
+                columns["ts"].append(ts)
+                columns["score"].append(STANCE_SCORES.get(stance, 0.0))
+                columns["scored"].append(stance in STANCE_SCORES)
+                columns["weight"].append(weight)
+                columns["half_life"].append(hl)
+
+        added = len(columns["ts"])
+        self.asset = np.concatenate([self.asset, np.asarray(columns["asset"], dtype=np.int32)])
+        self.author = np.concatenate([self.author, np.asarray(columns["author"], dtype=np.int32)])
+        self.ts = np.concatenate([self.ts, np.asarray(columns["ts"], dtype=np.float64)])
+        self.score = np.concatenate([self.score, np.asarray(columns["score"], dtype=np.float64)])
+        self.scored = np.concatenate([self.scored, np.asarray(columns["scored"], dtype=bool)])
+        self.weight = np.concatenate([self.weight, np.asarray(columns["weight"], dtype=np.float64)])
+        self.half_life = np.concatenate(
+            [self.half_life, np.asarray(columns["half_life"], dtype=np.float64)]
+        )
+        live = np.asarray(columns["weight"], dtype=np.float64) > 0
+        self.valid = np.concatenate([self.valid, live])
+        for post_id, indices in new_posts.items():
+            self.post_rows[post_id] = np.asarray(indices, dtype=np.int64)
+
+        if touched and self._cache:
+            self._update_cache(np.fromiter(touched, dtype=np.int32))
+        return added
+
+    def _bucket(self, as_of: float | None) -> float:
+        now = time.time() if as_of is None else as_of
+        return math.floor(now / self.resolution_seconds) * self.resolution_seconds
+
+    def _update_cache(self, touched: np.ndarray) -> None:
+        names = list(self.asset_codes)
+        for window, (as_of, cached) in self._cache.items():
+            for code in touched.tolist():
+                cached.pop(names[code], None)
+            cached.update(self._compute(window, as_of, touched))
+
+    def stats(self, window_hours: float, as_of: float | None = None) -> dict[str, AssetStats]:
+        """Return per-asset stats for the window ending at `as_of` (default: now)."""
+        window, bucket = window_hours * 3600.0, self._bucket(as_of)
+        cached = self._cache.get(window)
+        if cached is None or cached[0] != bucket:
+            cached = (bucket, self._compute(window, bucket))
+            self._cache[window] = cached
+        self._cache.move_to_end(window)
+        while len(self._cache) > self.max_windows:
+            self._cache.popitem(last=False)
+        return cached[1]
+
+    def _window(
+        self, window: float, as_of: float, touched: np.ndarray | None
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        n_assets = len(self.asset_codes)
+        mask = self.valid & (self.ts <= as_of) & (self.ts > as_of - window)
+        if touched is not None:
+            mask &= np.isin(self.asset, touched)
+        asset = self.asset[mask]
+        decayed = self.weight[mask] * np.exp2(-(as_of - self.ts[mask]) / self.half_life[mask])
+        scored = self.scored[mask]
+
+        count = np.bincount(asset, minlength=n_assets)
+        num = np.bincount(asset[scored], decayed[scored] * self.score[mask][scored], n_assets)
+        den = np.bincount(asset[scored], decayed[scored], n_assets)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            consensus = np.where(den > 0, num / den, np.nan)
+        return mask, asset, decayed, count, consensus
+
+    def _compute(
+        self, window: float, as_of: float, touched: np.ndarray | None = None
+    ) -> dict[str, AssetStats]:
+        n_assets = len(self.asset_codes)
+        mask, asset, decayed, count, consensus = self._window(window, as_of, touched)
+        *_, previous = self._window(window, as_of - window, touched)
+
+        # Author diversity: effective number of authors, exp(entropy) of decayed weight shares.
+        n_authors_total = max(len(self.author_codes), 1)
+        pair = asset.astype(np.int64) * n_authors_total + self.author[mask]
+        pairs, inverse = np.unique(pair, return_inverse=True)
+        pair_weight = np.bincount(inverse, decayed, len(pairs))
+        pair_asset = (pairs // n_authors_total).astype(np.int64)
+        asset_weight = np.bincount(pair_asset, pair_weight, n_assets)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            share = pair_weight / asset_weight[pair_asset]
+            plogp = np.where(share > 0, share * np.log(share), 0.0)
+        entropy = -np.bincount(pair_asset, plogp, n_assets)
+        n_authors = np.bincount(pair_asset, minlength=n_assets)
+
+        names = list(self.asset_codes)
+        codes = range(n_assets) if touched is None else touched.tolist()
+        result = {}
+        for code in codes:
+            if not count[code]:
+                continue
+            result[names[code]] = AssetStats(
+                asset=names[code],
+                n_posts=int(count[code]),
+                n_authors=int(n_authors[code]),
+                consensus=float(consensus[code]),
+                momentum=float(consensus[code] - previous[code]),
+                author_diversity=float(np.exp(entropy[code])),
+            )
+        return result
@@ -0,0 +1,133 @@
+"""Compaction of legacy rows and monthly cold storage for old posts."""
+
+import sqlite3
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+from v0.db import (
+    COMPRESSED_PREFIX,
+    connect,
+    decode_json,
+    encode_json,
+    init_db,
+    parse_timestamp,
+    raw_json_extras,
+)
+
+# Children first so deletes never leave dangling post_id references.
+ARCHIVE_TABLES = ("media", "alpha_objects", "raw_posts")
+
+
+def _is_compressed(value: str | bytes | None) -> bool:
+    return isinstance(value, bytes) and value.startswith(COMPRESSED_PREFIX)
+
+
+def compact_db(conn: sqlite3.Connection, vacuum: bool = True, batch_size: int = 1000) -> int:
+    """Rewrite plain-text raw_json/gatekeeper_json in compressed form; return rows rewritten.
+
+    Walks raw_posts in rowid order and commits per batch, so large DBs are never held
+    in memory or in one write transaction, and an interrupted run keeps its progress.
+    """
+    rewritten = 0
+    last_rowid = 0
+    while True:
+        rows = conn.execute(
+            """
+            SELECT rowid, post_id, raw_json, gatekeeper_json FROM raw_posts
+            WHERE rowid > ? ORDER BY rowid LIMIT ?
+            """,
+            (last_rowid, batch_size),
+        ).fetchall()
+        if not rows:
+            break
+        last_rowid = rows[-1]["rowid"]
+        for row in rows:
+            updates = {}
+            if row["raw_json"] is not None and not _is_compressed(row["raw_json"]):
+                raw = decode_json(row["raw_json"])
+                raw.setdefault("post_id", row["post_id"])
+                updates["raw_json"] = encode_json(raw_json_extras(raw))
+            if row["gatekeeper_json"] is not None and not _is_compressed(row["gatekeeper_json"]):
+                updates["gatekeeper_json"] = encode_json(decode_json(row["gatekeeper_json"]))
+            if not updates:
+                continue
+            assignments = ", ".join(f"{column}=?" for column in updates)
+            conn.execute(
+                f"UPDATE raw_posts SET {assignments} WHERE rowid=?",
+                (*updates.values(), row["rowid"]),
+            )
+            rewritten += 1
+        conn.commit()
+    if vacuum:
+        conn.execute("VACUUM")
+    return rewritten
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> list[str]:
+    return [row["name"] for row in conn.execute(f"PRAGMA main.table_info({table})")]
+
+
+def archive_rows(
+    conn: sqlite3.Connection, archive_dir: Path, retention_days: int
+) -> dict[str, int]:
+    """Move posts older than the retention window into `archive_dir/alpha-YYYY-MM.db`.
+
+    Archived posts leave digests and aggregation, but a tombstone in `archived_posts`
+    keeps them in dedupe and lets `fetch_raw_post`/`fetch_gatekeeper` find the cold copy.
+    Returns the number of posts moved per month.
+    """
+    cutoff = time.time() - retention_days * 86400
+    by_month: dict[str, list[str]] = defaultdict(list)
+    for row in conn.execute("SELECT post_id, created_at, scraped_at FROM raw_posts"):
+        ts = parse_timestamp(row["created_at"]) or parse_timestamp(row["scraped_at"])
+        if ts is not None and ts < cutoff:
+            month = datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m")
+            by_month[month].append(row["post_id"])
+
+    moved = {}
+    for month, post_ids in sorted(by_month.items()):
+        path = archive_dir / f"alpha-{month}.db"
+        cold = connect(str(path))
+        init_db(cold)
+        cold.close()
+
+        conn.commit()
+        conn.execute("ATTACH DATABASE ? AS cold", (str(path),))
+        try:
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS archive_ids (post_id TEXT PRIMARY KEY)")
+            conn.execute("DELETE FROM temp.archive_ids")
+            conn.executemany(
+                "INSERT INTO temp.archive_ids VALUES (?)", [(post_id,) for post_id in post_ids]
+            )
+            for table in reversed(ARCHIVE_TABLES):
+                columns = ", ".join(_columns(conn, table))
+                conn.execute(
+                    f"""
+                    INSERT OR REPLACE INTO cold.{table} ({columns})
+                    SELECT {columns} FROM main.{table}
+                    WHERE post_id IN (SELECT post_id FROM temp.archive_ids)
+                    """
+                )
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO main.archived_posts (post_id, text_hash, archive_path)
+                SELECT post_id, text_hash, ? FROM main.raw_posts
+                WHERE post_id IN (SELECT post_id FROM temp.archive_ids)
+                """,
+                (str(path.resolve()),),
+            )
+            for table in ARCHIVE_TABLES:
+                conn.execute(
+                    f"DELETE FROM main.{table} "
+                    "WHERE post_id IN (SELECT post_id FROM temp.archive_ids)"
+                )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.execute("DETACH DATABASE cold")
+        moved[month] = len(post_ids)
+    return moved
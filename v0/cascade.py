@@ -0,0 +1,82 @@
+"""Escalation policy for the two-tier analyst cascade.
+
+The fast analyst model handles every routed post; its output is re-extracted
+with the stronger model only when the policy flags it.
+"""
+
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any
+
+CONFIDENCE_ORDER = {"low": 0, "medium": 1, "high": 2}
+ESCALATION_TRIGGERS = ("low_confidence", "unclear_stance", "guardrail")
+LEVELS_RE = re.compile(r"\b(entry|stop|target|tp|sl)\b", re.IGNORECASE)
+
+
+def text_has_levels(text: str) -> bool:
+    return bool(LEVELS_RE.search(text))
+
+
+def levels_inconsistent(alpha: dict[str, Any], text: str) -> bool:
+    """True when the model reported levels the post never states (the guardrail would wipe them)."""
+    if text_has_levels(text):
+        return False
+    key_levels = alpha.get("key_levels") or {}
+    return bool(
+        key_levels.get("entry") or key_levels.get("invalidation") or key_levels.get("targets")
+    )
+
+
+@dataclass
+class EscalationPolicy:
+    triggers: tuple[str, ...] = ESCALATION_TRIGGERS
+    # Escalate when extraction_confidence is at or below this level.
+    max_confidence: str = "low"
+
+    def reasons(self, alpha: dict[str, Any], text: str) -> list[str]:
+        reasons = []
+        if "low_confidence" in self.triggers:
+            confidence = CONFIDENCE_ORDER.get(alpha.get("extraction_confidence") or "low", 0)
+            if confidence <= CONFIDENCE_ORDER[self.max_confidence]:
+                reasons.append("low_confidence")
+        if "unclear_stance" in self.triggers and alpha.get("stance", "unclear") == "unclear":
+            reasons.append("unclear_stance")
+        if "guardrail" in self.triggers and levels_inconsistent(alpha, text):
+            reasons.append("guardrail")
+        return reasons
+
+
+@dataclass
+class CascadeStats:
+    calls: int = 0
+    escalations: int = 0
+    reasons: dict[str, int] = field(default_factory=dict)
+    tier_seconds: dict[str, float] = field(default_factory=dict)
+    tier_calls: dict[str, int] = field(default_factory=dict)
+    # Reprocessing records from worker threads.
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record_call(self, tier: str, seconds: float) -> None:
+        with self.lock:
+            self.tier_seconds[tier] = self.tier_seconds.get(tier, 0.0) + seconds
+            self.tier_calls[tier] = self.tier_calls.get(tier, 0) + 1
+
+    def record_extraction(self, reasons: list[str]) -> None:
+        with self.lock:
+            self.calls += 1
+            if reasons:
+                self.escalations += 1
+            for reason in reasons:
+                self.reasons[reason] = self.reasons.get(reason, 0) + 1
+
+    def format(self) -> str:
+        rate = self.escalations / self.calls if self.calls else 0.0
+        lines = [f"Escalated {self.escalations}/{self.calls} analyst extractions ({rate:.0%})."]
+        if self.reasons:
+            reasons = ", ".join(f"{k}:{v}" for k, v in sorted(self.reasons.items()))
+            lines.append(f"  reasons: {reasons}")
+        for tier, count in self.tier_calls.items():
+            mean_ms = self.tier_seconds[tier] / count * 1000
+            lines.append(f"  {tier}: {count} calls, mean {mean_ms:.0f} ms")
+        return "\n".join(lines)
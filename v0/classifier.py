@@ -0,0 +1,219 @@
+"""Hashed n-gram logistic regression distilled from stored LLM gatekeeper labels.
+
+The model predicts whether the gatekeeper would route a post to the analyst
+(`is_finance_relevant and (is_actionable_trade_idea or has_media_worth_processing)`).
+Thresholds are calibrated on a held-out split so that only posts the model is
+very sure about bypass the LLM gatekeeper.
+"""
+
+import math
+import re
+import sqlite3
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from v0.db import fetch_llm_gatekeeper_labels
+from v0.pipeline import gatekeeper_routes
+
+DEFAULT_MODEL_PATH = Path("data/relevance_model.npz")
+TOKEN_RE = re.compile(r"\$?[a-z]+|\d+(?:\.\d+)?|https?://")
+# Sentinels outside [0, 1] mean "never skip on this side".
+DISABLED_LOW = -1.0
+DISABLED_HIGH = 2.0
+
+
+def tokenize(text: str) -> list[str]:
+    return ["<num>" if token[0].isdigit() else token for token in TOKEN_RE.findall(text.lower())]
+
+
+def featurize(text: str, n_features: int) -> np.ndarray:
+    """Return the sorted unique hashed unigram+bigram indices of `text`."""
+    tokens = tokenize(text or "")
+    grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:], strict=False)]
+    if not grams:
+        return np.empty(0, dtype=np.int64)
+    # crc32 rather than hash() so indices are stable across processes.
+    indices = np.fromiter(
+        (zlib.crc32(gram.encode("utf-8")) for gram in grams), dtype=np.int64, count=len(grams)
+    )
+    return np.unique(indices % n_features)
+
+
+def sigmoid(z: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -35.0, 35.0)))
+
+
+@dataclass
+class RelevanceModel:
+    weights: np.ndarray
+    bias: float
+    low: float = DISABLED_LOW
+    high: float = DISABLED_HIGH
+
+    @property
+    def n_features(self) -> int:
+        return len(self.weights)
+
+    def score(self, text: str) -> float:
+        z = self.weights[featurize(text, self.n_features)].sum() + self.bias
+        return 1.0 / (1.0 + math.exp(-min(max(float(z), -35.0), 35.0)))
+
+    def decide(self, text: str) -> tuple[bool | None, float]:
+        """Return (route, score); route is None when the score is not extreme."""
+        p = self.score(text)
+        if p <= self.low:
+            return False, p
+        if p >= self.high:
+            return True, p
+        return None, p
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("wb") as handle:
+            np.savez(
+                handle,
+                weights=self.weights,
+                bias=self.bias,
+                low=self.low,
+                high=self.high,
+            )
+
+    @classmethod
+    def load(cls, path: Path) -> "RelevanceModel":
+        with np.load(path) as data:
+            return cls(
+                weights=data["weights"],
+                bias=float(data["bias"]),
+                low=float(data["low"]),
+                high=float(data["high"]),
+            )
+
+
+def _design(texts: list[str], n_features: int) -> tuple[np.ndarray, np.ndarray]:
+    """Flatten binary features into parallel (row, column) index arrays."""
+    features = [featurize(text, n_features) for text in texts]
+    rows = np.repeat(np.arange(len(features)), [len(f) for f in features])
+    cols = np.concatenate(features) if features else np.empty(0, dtype=np.int64)
+    return rows, cols
+
+
+def _predict(
+    weights: np.ndarray, bias: float, rows: np.ndarray, cols: np.ndarray, n: int
+) -> np.ndarray:
+    return sigmoid(np.bincount(rows, weights[cols], minlength=n) + bias)
+
+
+def fit(
+    texts: list[str],
+    labels: np.ndarray,
+    n_features: int = 2**18,
+    epochs: int = 300,
+    learning_rate: float = 0.5,
+    l2: float = 1e-4,
+) -> RelevanceModel:
+    """Full-batch Adagrad on the L2-regularised logistic loss."""
+    n = len(texts)
+    rows, cols = _design(texts, n_features)
+    weights = np.zeros(n_features, dtype=np.float64)
+    prior = labels.mean() if n else 0.5
+    bias = float(np.log(max(prior, 1e-6) / max(1.0 - prior, 1e-6)))
+    g2_weights = np.full(n_features, 1e-8)
+    g2_bias = 1e-8
+
+    for _ in range(epochs):
+        error = _predict(weights, bias, rows, cols, n) - labels
+        grad_weights = np.bincount(cols, error[rows], minlength=n_features) / n + l2 * weights
+        grad_bias = float(error.mean())
+        g2_weights += grad_weights**2
+        g2_bias += grad_bias**2
+        weights -= learning_rate * grad_weights / np.sqrt(g2_weights)
+        bias -= learning_rate * grad_bias / np.sqrt(g2_bias)
+
+    return RelevanceModel(weights=weights, bias=bias)
+
+
+def calibrate(
+    probs: np.ndarray, labels: np.ndarray, target_precision: float, min_support: int
+) -> tuple[float, float]:
+    """Pick the widest score bands on each side of 0.5 whose held-out precision meets the target."""
+    low, high = DISABLED_LOW, DISABLED_HIGH
+    support = np.arange(1, len(probs) + 1)
+
+    ascending = np.argsort(probs, kind="stable")
+    negative_precision = np.cumsum(labels[ascending] == 0) / support
+    ok = (negative_precision >= target_precision) & (support >= min_support)
+    ok = np.nonzero(ok & (probs[ascending] < 0.5))[0]
+    if ok.size:
+        low = float(probs[ascending][ok.max()])
+
+    descending = ascending[::-1]
+    positive_precision = np.cumsum(labels[descending] == 1) / support
+    ok = (positive_precision >= target_precision) & (support >= min_support)
+    ok = np.nonzero(ok & (probs[descending] > 0.5))[0]
+    if ok.size:
+        high = float(probs[descending][ok.max()])
+    return low, high
+
+
+def train_from_db(
+    conn: sqlite3.Connection,
+    model_path: Path = DEFAULT_MODEL_PATH,
+    holdout: float = 0.2,
+    target_precision: float = 0.98,
+    min_support: int = 20,
+    seed: int = 0,
+) -> dict[str, Any]:
+    """Train on stored LLM labels, calibrate on half the holdout, evaluate on the other half.
+
+    The holdout is drawn from the `audit` stream when there is one, else from posts
+    labelled before the rules existed: rules and the classifier keep extreme posts away
+    from the LLM, so only those rows match the distribution the model scores in production.
+    """
+    rows = fetch_llm_gatekeeper_labels(conn)
+    if not rows:
+        raise ValueError("No LLM gatekeeper labels to train on.")
+    texts = [row["text"] or "" for row in rows]
+    labels = np.array([gatekeeper_routes(row["gatekeeper"]) for row in rows], dtype=np.float64)
+
+    order = np.random.default_rng(seed).permutation(len(rows))
+    n_holdout = int(len(rows) * holdout)
+    holdout_source = "mixed"
+    for source in ("audit", None):
+        unbiased = np.array([rows[i]["source"] == source for i in order], dtype=bool)
+        if unbiased.any():
+            # Unbiased rows first, so the holdout takes them before any llm row.
+            order = np.concatenate([order[unbiased], order[~unbiased]])
+            n_holdout = min(n_holdout, int(unbiased.sum()))
+            holdout_source = source or "pre_rules"
+            break
+    held, train = order[:n_holdout], order[n_holdout:]
+    # Thresholds are picked on `calib`, so only `evaluate` gives an unbiased skip accuracy.
+    calib, evaluate = held[: n_holdout // 2], held[n_holdout // 2 :]
+
+    model = fit([texts[i] for i in train], labels[train])
+    calib_probs = np.array([model.score(texts[i]) for i in calib])
+    model.low, model.high = calibrate(calib_probs, labels[calib], target_precision, min_support)
+    model.save(model_path)
+
+    eval_probs = np.array([model.score(texts[i]) for i in evaluate])
+    skipped_low = eval_probs <= model.low
+    skipped_high = eval_probs >= model.high
+    skipped = skipped_low | skipped_high
+    correct = (skipped_low & (labels[evaluate] == 0)) | (skipped_high & (labels[evaluate] == 1))
+    return {
+        "labels": len(rows),
+        "holdout_source": holdout_source,
+        "train": len(train),
+        "calibration": len(calib),
+        "evaluation": len(evaluate),
+        "positive_rate": float(labels.mean()),
+        "low": model.low,
+        "high": model.high,
+        "eval_skip_rate": float(skipped.mean()) if len(evaluate) else 0.0,
+        "eval_skip_accuracy": float(correct.sum() / skipped.sum()) if skipped.any() else None,
+        "model_path": str(model_path),
+    }
@@ -1,30 +1,142 @@
 import json
 import sqlite3
+import zlib
+from datetime import datetime
 from pathlib import Path
 from typing import Any, Iterable
 
-MIGRATION_PATH = Path(__file__).resolve().parents[1] / "db" / "migrations" / "001_init.sql"
+from v0.trace import traced
 
+MIGRATIONS_DIR = Path(__file__).resolve().parents[1] / "db" / "migrations"
 
-def connect(db_path: str = "data/alpha.db") -> sqlite3.Connection:
+# raw_posts columns; raw_json only keeps the fields of a scraped row that are not one of these.
+RAW_POST_COLUMNS = (
+    "post_id",
+    "url",
+    "username",
+    "text",
+    "created_at",
+    "scraped_at",
+    "text_hash",
+    "raw_json",
+)
+
+# Preset zlib dictionary of the keys and values that recur in stored JSON, written with the
+# same compact separators as encode_json so its phrases match. Changing it requires a new
+# COMPRESSED_PREFIX so existing blobs can still be decoded.
+JSON_ZDICT = (
+    b'{"list_url":"https://x.com/i/lists/","reply_count":0,"retweet_count":0,'
+    b'"like_count":0,"id":"","skipped":true,"reason":"stage0","classifier",'
+    b'"score":0.0,"is_finance_relevant":false,"is_actionable_trade_idea":false,'
+    b'"has_media_worth_processing":false,"primary_assets_detected":[],'
+    b'"reason_code":"single_name","macro","sector","crypto","rates","other",'
+    b'"is_finance_relevant":true,"is_actionable_trade_idea":true}'
+)
+COMPRESSED_PREFIX = b"z1:"
+
+
+def connect(db_path: str = "data/alpha.db", check_same_thread: bool = True) -> sqlite3.Connection:
     Path(db_path).parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(db_path)
+    conn = sqlite3.connect(db_path, check_same_thread=check_same_thread)
     conn.row_factory = sqlite3.Row
     return conn
 
 
+def list_migrations() -> list[tuple[int, Path]]:
+    """Return (version, path) pairs for `NNN_name.sql` files, in order."""
+    migrations = []
+    for path in MIGRATIONS_DIR.glob("*.sql"):
+        prefix = path.name.split("_", 1)[0]
+        if prefix.isdigit():
+            migrations.append((int(prefix), path))
+    return sorted(migrations)
+
+
+def _split_statements(script: str) -> list[str]:
+    """Split a SQL script into statements (trigger bodies included) for use in a transaction."""
+    statements, buffer = [], ""
+    for line in script.splitlines(keepends=True):
+        buffer += line
+        if sqlite3.complete_statement(buffer):
+            statements.append(buffer.strip())
+            buffer = ""
+    if buffer.strip():
+        statements.append(buffer.strip())
+    return statements
+
+
+def _pending_migrations(conn: sqlite3.Connection) -> list[tuple[int, Path]]:
+    current = conn.execute("PRAGMA user_version").fetchone()[0]
+    return [(version, path) for version, path in list_migrations() if version > current]
+
+
 def init_db(conn: sqlite3.Connection) -> None:
-    sql = MIGRATION_PATH.read_text(encoding="utf-8")
-    conn.executescript(sql)
+    """Apply migrations newer than the DB's `user_version`; a no-op when current.
+
+    Migrations run under BEGIN IMMEDIATE and `user_version` is re-read inside it, so
+    concurrent processes opening the same old DB apply each migration exactly once.
+    """
+    if not _pending_migrations(conn):
+        return
     conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for version, path in _pending_migrations(conn):
+            for statement in _split_statements(path.read_text(encoding="utf-8")):
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {version:d}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def encode_json(value: Any) -> bytes:
+    compressor = zlib.compressobj(level=9, zdict=JSON_ZDICT)
+    data = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return COMPRESSED_PREFIX + compressor.compress(data) + compressor.flush()
+
+
+def decode_json(value: str | bytes | None) -> Any:
+    """Decode a JSON column written either compressed or as plain text."""
+    if value is None:
+        return None
+    if isinstance(value, bytes) and value.startswith(COMPRESSED_PREFIX):
+        decompressor = zlib.decompressobj(zdict=JSON_ZDICT)
+        value = decompressor.decompress(value[len(COMPRESSED_PREFIX) :])
+    return json.loads(value)
+
+
+def raw_json_extras(row: dict[str, Any]) -> dict[str, Any]:
+    extras = {key: value for key, value in row.items() if key not in RAW_POST_COLUMNS}
+    if extras.get("id") == row.get("post_id"):
+        extras.pop("id")
+    return extras
+
+
+def parse_timestamp(value: str | None) -> float | None:
+    """Parse ISO-8601 or X's `Wed Oct 10 20:19:24 +0000 2018` format to epoch seconds."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        pass
+    try:
+        return datetime.strptime(value, "%a %b %d %H:%M:%S %z %Y").timestamp()
+    except ValueError:
+        return None
 
 
+@traced("db.insert_raw_post")
 def insert_raw_post(conn: sqlite3.Connection, row: dict[str, Any]) -> bool:
+    # Archived posts keep a tombstone, so a re-read scrape file never resurrects them.
     cursor = conn.execute(
         """
         INSERT OR IGNORE INTO raw_posts
           (post_id, url, username, text, created_at, scraped_at, text_hash, raw_json)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        SELECT ?, ?, ?, ?, ?, ?, ?, ?
+        WHERE NOT EXISTS (SELECT 1 FROM archived_posts WHERE post_id=?)
         """,
         (
             row.get("post_id"),
@@ -34,52 +146,72 @@ def insert_raw_post(conn: sqlite3.Connection, row: dict[str, Any]) -> bool:
             row.get("created_at"),
             row.get("scraped_at"),
             row.get("text_hash"),
-            row.get("raw_json") or json.dumps(row, ensure_ascii=False),
+            encode_json(raw_json_extras(row)),
+            row.get("post_id"),
         ),
     )
     conn.commit()
     return cursor.rowcount > 0
 
 
+@traced("db.text_hash_exists")
 def text_hash_exists(conn: sqlite3.Connection, text_hash_value: str) -> bool:
     if not text_hash_value:
         return False
     row = conn.execute(
-        "SELECT 1 FROM raw_posts WHERE text_hash=? LIMIT 1",
-        (text_hash_value,),
+        """
+        SELECT 1 FROM raw_posts WHERE text_hash=?
+        UNION ALL
+        SELECT 1 FROM archived_posts WHERE text_hash=?
+        LIMIT 1
+        """,
+        (text_hash_value, text_hash_value),
     ).fetchone()
     return row is not None
 
 
-def update_gatekeeper(conn: sqlite3.Connection, post_id: str, gatekeeper: dict[str, Any]) -> None:
+@traced("db.update_gatekeeper")
+def update_gatekeeper(
+    conn: sqlite3.Connection,
+    post_id: str,
+    gatekeeper: dict[str, Any],
+    source: str = "llm",
+    version: str | None = None,
+) -> None:
     conn.execute(
-        "UPDATE raw_posts SET gatekeeper_json=?, processed_at=datetime('now') WHERE post_id=?",
-        (json.dumps(gatekeeper, ensure_ascii=False), post_id),
+        """
+        UPDATE raw_posts
+        SET gatekeeper_json=?, gatekeeper_source=?, gatekeeper_version=?,
+            processed_at=datetime('now')
+        WHERE post_id=?
+        """,
+        (encode_json(gatekeeper), source, version, post_id),
     )
     conn.commit()
 
 
+@traced("db.update_alpha")
 def update_alpha(
     conn: sqlite3.Connection,
     post_id: str,
     alpha: dict[str, Any],
     created_at: str | None,
+    analyst_model: str | None = None,
+    escalation_reasons: list[str] | None = None,
+    version: str | None = None,
 ) -> None:
     alpha_json = json.dumps(alpha, ensure_ascii=False)
     assets_json = json.dumps(alpha.get("assets", []), ensure_ascii=False)
     conn.execute(
-        """
-        UPDATE raw_posts
-        SET alpha_json=?, processed_at=datetime('now')
-        WHERE post_id=?
-        """,
-        (alpha_json, post_id),
+        "UPDATE raw_posts SET processed_at=datetime('now') WHERE post_id=?",
+        (post_id,),
     )
     conn.execute(
         """
         INSERT OR REPLACE INTO alpha_objects
-          (post_id, assets_json, stance, timeframe, extraction_confidence, alpha_json, created_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
+          (post_id, assets_json, stance, timeframe, extraction_confidence, alpha_json, created_at,
+           analyst_model, escalation_reasons, alpha_version)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """,
         (
             post_id,
@@ -89,6 +221,9 @@ def update_alpha(
             alpha.get("extraction_confidence"),
             alpha_json,
             created_at,
+            analyst_model,
+            json.dumps(escalation_reasons) if escalation_reasons else None,
+            version,
         ),
     )
     conn.commit()
@@ -103,3 +238,172 @@ def fetch_unprocessed(conn: sqlite3.Connection) -> Iterable[sqlite3.Row]:
         ORDER BY created_at DESC
         """
     )
+
+
+@traced("db.delete_alpha")
+def delete_alpha(conn: sqlite3.Connection, post_id: str) -> None:
+    conn.execute("DELETE FROM alpha_objects WHERE post_id=?", (post_id,))
+    conn.commit()
+
+
+def fetch_stale_alpha(
+    conn: sqlite3.Connection,
+    current_versions: list[str],
+    since: str | None = None,
+    asset: str | None = None,
+) -> list[sqlite3.Row]:
+    """Alpha rows not stamped with one of `current_versions`, optionally filtered."""
+    placeholders = ", ".join("?" for _ in current_versions) or "NULL"
+    return conn.execute(
+        f"""
+        SELECT alpha_objects.post_id,
+               alpha_objects.alpha_json,
+               alpha_objects.alpha_version,
+               raw_posts.url,
+               raw_posts.username,
+               raw_posts.text,
+               raw_posts.created_at,
+               raw_posts.scraped_at
+        FROM alpha_objects
+        JOIN raw_posts ON raw_posts.post_id = alpha_objects.post_id
+        WHERE (alpha_objects.alpha_version IS NULL
+               OR alpha_objects.alpha_version NOT IN ({placeholders}))
+          AND (? IS NULL OR COALESCE(raw_posts.created_at, raw_posts.scraped_at) >= ?)
+          AND (? IS NULL OR EXISTS (
+                SELECT 1 FROM json_each(alpha_objects.assets_json) WHERE value = ?))
+        ORDER BY raw_posts.created_at DESC
+        """,
+        (*current_versions, since, since, asset, asset),
+    ).fetchall()
+
+
+def fetch_stale_gatekeeper(
+    conn: sqlite3.Connection, current_version: str, since: str | None = None
+) -> list[sqlite3.Row]:
+    """LLM gatekeeper rows whose version differs from `current_version`."""
+    return conn.execute(
+        """
+        SELECT raw_posts.post_id,
+               raw_posts.gatekeeper_source,
+               raw_posts.url,
+               raw_posts.username,
+               raw_posts.text,
+               raw_posts.created_at,
+               raw_posts.scraped_at,
+               raw_posts.gatekeeper_json,
+               alpha_objects.alpha_json
+        FROM raw_posts
+        LEFT JOIN alpha_objects ON alpha_objects.post_id = raw_posts.post_id
+        WHERE raw_posts.gatekeeper_source IN ('llm', 'audit')
+          AND (raw_posts.gatekeeper_version IS NULL OR raw_posts.gatekeeper_version != ?)
+          AND (? IS NULL OR COALESCE(raw_posts.created_at, raw_posts.scraped_at) >= ?)
+        ORDER BY raw_posts.created_at DESC
+        """,
+        (current_version, since, since),
+    ).fetchall()
+
+
+def _fetch_post_columns(conn: sqlite3.Connection, post_id: str, columns: str) -> sqlite3.Row | None:
+    """Read raw_posts columns for a post, following its tombstone into the cold DB."""
+    query = f"SELECT {columns} FROM raw_posts WHERE post_id=?"
+    row = conn.execute(query, (post_id,)).fetchone()
+    if row is not None:
+        return row
+    archived = conn.execute(
+        "SELECT archive_path FROM archived_posts WHERE post_id=?", (post_id,)
+    ).fetchone()
+    if archived is None or not Path(archived["archive_path"]).exists():
+        return None
+    cold = connect(archived["archive_path"])
+    try:
+        return cold.execute(query, (post_id,)).fetchone()
+    finally:
+        cold.close()
+
+
+def fetch_raw_post(conn: sqlite3.Connection, post_id: str) -> dict[str, Any] | None:
+    """Return the scraped row as originally ingested, rebuilt from columns and raw_json."""
+    row = _fetch_post_columns(conn, post_id, ", ".join(RAW_POST_COLUMNS))
+    if row is None:
+        return None
+    post = decode_json(row["raw_json"]) or {}
+    post.update({key: row[key] for key in RAW_POST_COLUMNS if key != "raw_json"})
+    return post
+
+
+def fetch_gatekeeper(conn: sqlite3.Connection, post_id: str) -> dict[str, Any] | None:
+    row = _fetch_post_columns(conn, post_id, "gatekeeper_json")
+    return decode_json(row["gatekeeper_json"]) if row else None
+
+
+def fetch_llm_gatekeeper_labels(conn: sqlite3.Connection) -> list[dict[str, Any]]:
+    """LLM labels with their source: 'llm' (rules and classifier abstained), 'audit', or
+    None for posts labelled before gatekeeper_source existed, when every post went to the LLM.
+    """
+    rows = conn.execute(
+        """
+        SELECT post_id, text, gatekeeper_json, gatekeeper_source
+        FROM raw_posts
+        WHERE gatekeeper_json IS NOT NULL
+          AND (gatekeeper_source IN ('llm', 'audit') OR gatekeeper_source IS NULL)
+        ORDER BY post_id
+        """
+    )
+    labels = []
+    for row in rows:
+        gate = decode_json(row["gatekeeper_json"])
+        # Pre-source rows also hold the stage0 skip marker.
+        if gate.get("skipped"):
+            continue
+        labels.append(
+            {
+                "post_id": row["post_id"],
+                "source": row["gatekeeper_source"],
+                "text": row["text"],
+                "gatekeeper": gate,
+            }
+        )
+    return labels
+
+
+def count_gatekeeper_sources(conn: sqlite3.Connection) -> dict[str | None, int]:
+    """How many stored gatekeeper decisions each source produced."""
+    rows = conn.execute(
+        """
+        SELECT gatekeeper_source, COUNT(*)
+        FROM raw_posts
+        WHERE gatekeeper_json IS NOT NULL
+        GROUP BY gatekeeper_source
+        """
+    )
+    return dict(rows.fetchall())
+
+
+def alpha_changes(conn: sqlite3.Connection) -> tuple[int, int]:
+    """Return the trigger-maintained (inserts, deletes) counters of alpha_objects."""
+    row = conn.execute("SELECT inserts, deletes FROM alpha_changes WHERE id = 1").fetchone()
+    return (row["inserts"], row["deletes"]) if row else (0, 0)
+
+
+def fetch_alpha_rows(
+    conn: sqlite3.Connection, after_rowid: int = 0, since: str | None = None
+) -> list[sqlite3.Row]:
+    return conn.execute(
+        """
+        SELECT alpha_objects.rowid AS rowid,
+               alpha_objects.post_id,
+               alpha_objects.assets_json,
+               alpha_objects.stance,
+               alpha_objects.timeframe,
+               alpha_objects.extraction_confidence,
+               alpha_objects.alpha_json,
+               alpha_objects.created_at,
+               raw_posts.username
+        FROM alpha_objects
+        LEFT JOIN raw_posts ON raw_posts.post_id = alpha_objects.post_id
+        WHERE alpha_objects.rowid > ?
+          AND (? IS NULL OR alpha_objects.created_at >= ?)
+        ORDER BY alpha_objects.rowid
+        """,
+        (after_rowid, since, since),
+    ).fetchall()
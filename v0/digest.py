@@ -1,57 +1,102 @@
 import json
+import sqlite3
 from collections import defaultdict
 from datetime import datetime, timedelta, timezone
+from typing import Any
 
+from v0.aggregate import AggregationEngine, AssetStats
 from v0.db import connect, init_db
+from v0.trace import span, traced
 
+DigestGroup = tuple[str, list[tuple[sqlite3.Row, dict]], AssetStats | None]
 
-def make_digest(hours: int = 12) -> str:
-    conn = connect()
-    init_db(conn)
+
+def format_score(value: float) -> str:
+    return "n/a" if value != value else f"{value:+.2f}"
+
+
+def json_score(value: float) -> float | None:
+    return None if value != value else round(value, 4)
+
+
+def post_url(row: sqlite3.Row) -> str:
+    username = row["username"]
+    if username:
+        return f"https://x.com/{username}/status/{row['post_id']}"
+    return f"(post {row['post_id']})"
+
+
+def collect_digest(
+    conn: sqlite3.Connection,
+    hours: int,
+    engine: AggregationEngine | None = None,
+    asset: str | None = None,
+) -> list[DigestGroup]:
+    """Return (asset, [(row, alpha), ...], stats) groups, most-discussed asset first."""
     cutoff = (datetime.now(timezone.utc) - timedelta(hours=hours)).isoformat()
 
-    rows = conn.execute(
-        """
-        SELECT raw_posts.post_id,
-               raw_posts.username,
-               raw_posts.created_at,
-               raw_posts.scraped_at,
-               raw_posts.alpha_json
-        FROM raw_posts
-        WHERE raw_posts.alpha_json IS NOT NULL
-          AND COALESCE(raw_posts.created_at, raw_posts.scraped_at) >= ?
-        ORDER BY raw_posts.created_at DESC
-        """,
-        (cutoff,),
-    ).fetchall()
-
-    by_asset: dict[str, list[tuple[dict, dict]]] = defaultdict(list)
+    with span("digest.query"):
+        rows = conn.execute(
+            """
+            SELECT raw_posts.post_id,
+                   raw_posts.username,
+                   raw_posts.created_at,
+                   raw_posts.scraped_at,
+                   alpha_objects.alpha_json
+            FROM alpha_objects
+            JOIN raw_posts ON raw_posts.post_id = alpha_objects.post_id
+            WHERE COALESCE(raw_posts.created_at, raw_posts.scraped_at) >= ?
+            ORDER BY raw_posts.created_at DESC
+            """,
+            (cutoff,),
+        ).fetchall()
+
+    by_asset: dict[str, list[tuple[sqlite3.Row, dict]]] = defaultdict(list)
 
     for row in rows:
         alpha = json.loads(row["alpha_json"])
         assets = alpha.get("assets") or ["(unmapped)"]
-        for asset in assets:
-            by_asset[asset].append((row, alpha))
+        for name in assets:
+            if asset is None or name == asset:
+                by_asset[name].append((row, alpha))
+
+    with span("digest.aggregate"):
+        if engine is None:
+            # Momentum compares against the previous window, so 2x covers every row used.
+            engine = AggregationEngine(conn, history_hours=2 * hours)
+        engine.refresh()
+        stats = engine.stats(window_hours=hours)
+
+    return [
+        (name, items, stats.get(name))
+        for name, items in sorted(by_asset.items(), key=lambda kv: len(kv[1]), reverse=True)
+    ]
 
-    lines = [f"# Digest (last {hours}h)", ""]
 
-    for asset, items in sorted(by_asset.items(), key=lambda kv: len(kv[1]), reverse=True):
-        stances = defaultdict(int)
-        for _, alpha in items:
-            stances[alpha.get("stance", "unclear")] += 1
+def stance_counts(items: list[tuple[sqlite3.Row, dict]]) -> dict[str, int]:
+    stances: dict[str, int] = defaultdict(int)
+    for _, alpha in items:
+        stances[alpha.get("stance", "unclear")] += 1
+    return dict(stances)
 
-        stance_text = ", ".join([f"{k}:{v}" for k, v in stances.items()])
+
+@traced("digest.render")
+def render_markdown(hours: int, groups: list[DigestGroup]) -> str:
+    lines = [f"# Digest (last {hours}h)", ""]
+
+    for asset, items, asset_stats in groups:
+        stance_text = ", ".join([f"{k}:{v}" for k, v in stance_counts(items).items()])
+        if asset_stats:
+            stance_text += (
+                f" | consensus {format_score(asset_stats.consensus)}"
+                f", momentum {format_score(asset_stats.momentum)}"
+                f", authors {asset_stats.author_diversity:.1f}"
+            )
         lines.append(f"## {asset} — {stance_text}")
         lines.append("")
 
         for row, alpha in items[:5]:
-            username = row["username"]
-            url = (
-                f"https://x.com/{username}/status/{row['post_id']}"
-                if username
-                else f"(post {row['post_id']})"
-            )
-            lines.append(f"- {url}")
+            lines.append(f"- {post_url(row)}")
             for bullet in (alpha.get("rationale_bullets") or [])[:3]:
                 lines.append(f"  - {bullet}")
             evidence = alpha.get("evidence", {})
@@ -62,7 +107,44 @@ def make_digest(hours: int = 12) -> str:
     return "\n".join(lines)
 
 
-def write_digest(path: str, hours: int) -> None:
-    digest = make_digest(hours=hours)
+@traced("digest.render")
+def render_json(hours: int, groups: list[DigestGroup]) -> dict[str, Any]:
+    assets = []
+    for asset, items, asset_stats in groups:
+        entry: dict[str, Any] = {"asset": asset, "stances": stance_counts(items)}
+        if asset_stats:
+            entry.update(
+                consensus=json_score(asset_stats.consensus),
+                momentum=json_score(asset_stats.momentum),
+                author_diversity=json_score(asset_stats.author_diversity),
+                n_authors=asset_stats.n_authors,
+            )
+        entry["posts"] = [
+            {
+                "post_id": row["post_id"],
+                "url": post_url(row),
+                "username": row["username"],
+                "created_at": row["created_at"] or row["scraped_at"],
+                "stance": alpha.get("stance"),
+                "rationale_bullets": (alpha.get("rationale_bullets") or [])[:3],
+                "links": [
+                    link.get("url") for link in (alpha.get("evidence", {}).get("links") or [])[:3]
+                ],
+            }
+            for row, alpha in items[:5]
+        ]
+        assets.append(entry)
+    return {"hours": hours, "assets": assets}
+
+
+@traced("digest")
+def make_digest(hours: int = 12, db_path: str = "data/alpha.db") -> str:
+    conn = connect(db_path)
+    init_db(conn)
+    return render_markdown(hours, collect_digest(conn, hours))
+
+
+def write_digest(path: str, hours: int, db_path: str = "data/alpha.db") -> None:
+    digest = make_digest(hours=hours, db_path=db_path)
     with open(path, "w", encoding="utf-8") as handle:
         handle.write(digest)
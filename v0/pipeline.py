@@ -1,12 +1,14 @@
 import hashlib
 import json
 import re
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
-from dotenv import load_dotenv
-
+from v0.cascade import CascadeStats, EscalationPolicy, text_has_levels
 from v0.db import (
     fetch_unprocessed,
     insert_raw_post,
@@ -14,17 +16,48 @@ from v0.db import (
     update_alpha,
     update_gatekeeper,
 )
-from v0.llm import build_client, load_prompt, load_schema, normalize_model_name, structured_call
+from v0.rules import extract_cashtags, reason_code_for, rule_gatekeeper
+from v0.trace import span, traced
+
+# Share of stage0-passing posts that skip rules and classifier and go to the LLM anyway, so
+# stored LLM labels include an unbiased sample for calibration and agreement reports.
+DEFAULT_AUDIT_RATE = 0.02
+
+
+def gatekeeper_routes(gate: dict[str, Any]) -> bool:
+    return bool(
+        gate.get("is_finance_relevant")
+        and (gate.get("is_actionable_trade_idea") or gate.get("has_media_worth_processing"))
+    )
+
+
+def audit_sample(post_id: str, rate: float) -> bool:
+    """Deterministically pick about `rate` of all posts for the LLM-labelled audit stream."""
+    digest = hashlib.sha256(f"audit:{post_id}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:4], "big") < rate * 2**32
+
+
+def classifier_gate(route: bool, text: str) -> dict[str, Any]:
+    """A GatekeeperResult for a post the classifier decided, assets taken from its cashtags."""
+    tickers = extract_cashtags(text)
+    return {
+        "is_finance_relevant": route,
+        "is_actionable_trade_idea": route,
+        "has_media_worth_processing": False,
+        "primary_assets_detected": tickers,
+        "reason_code": reason_code_for(tickers) or "other",
+    }
+
 
 NOISE_RE = re.compile(
-    r"(\\$[A-Za-z]{1,10})|(\\b(long|short|buy|sell|bullish|bearish|puts|calls|"
-    r"target|stop|breakout|support|resistance|earnings|cpi|fomc)\\b)|(\\b\\d+(\\.\\d+)?\\b)",
+    r"(\$[A-Za-z]{1,10})|(\b(long|short|buy|sell|bullish|bearish|puts|calls|"
+    r"target|stop|breakout|support|resistance|earnings|cpi|fomc)\b)|(\b\d+(\.\d+)?\b)",
     re.IGNORECASE,
 )
 
 
 def normalize_text(text: str) -> str:
-    return re.sub(r"\\s+", " ", text or "").strip().lower()
+    return re.sub(r"\s+", " ", text or "").strip().lower()
 
 
 def text_hash(text: str) -> str:
@@ -35,6 +68,7 @@ def stage0_keep(text: str) -> bool:
     return bool(NOISE_RE.search(text)) or ("http" in text)
 
 
+@traced("ingest")
 def ingest_jsonl(conn, jsonl_path: Path) -> int:
     inserted = 0
     with jsonl_path.open("r", encoding="utf-8") as handle:
@@ -47,7 +81,6 @@ def ingest_jsonl(conn, jsonl_path: Path) -> int:
                 continue
             row["post_id"] = post_id
             row["text_hash"] = text_hash(row.get("text", ""))
-            row["raw_json"] = json.dumps(row)
             if text_hash_exists(conn, row["text_hash"]):
                 continue
             if insert_raw_post(conn, row):
@@ -55,21 +88,158 @@ def ingest_jsonl(conn, jsonl_path: Path) -> int:
     return inserted
 
 
-def process_posts(
-    conn,
+def stage_version(prompt_path: Path, schema_path: Path, model: str) -> str:
+    """Short hash of the prompt, schema and model that produce a stored LLM result."""
+    digest = hashlib.sha256()
+    for part in (prompt_path.read_bytes(), schema_path.read_bytes(), model.encode("utf-8")):
+        digest.update(hashlib.sha256(part).digest())
+    return digest.hexdigest()[:16]
+
+
+@dataclass
+class LLMStages:
+    """Loaded prompts, schemas and client shared by `process_posts` and `reprocess`."""
+
+    client: Any
+    call: Callable[..., dict[str, Any]]
+    gate_model: str
+    gate_prompt: str
+    gate_schema: dict[str, Any]
+    gate_version: str
+    analyst_model: str
+    escalation_model: str | None
+    alpha_prompt: str
+    alpha_schema: dict[str, Any]
+    analyst_versions: dict[str, str]
+    policy: EscalationPolicy
+    stats: CascadeStats
+
+    def gatekeeper(self, text: str) -> dict[str, Any]:
+        with span("gatekeeper"):
+            return self.call(
+                client=self.client,
+                model=self.gate_model,
+                system_prompt=self.gate_prompt,
+                user_text=text,
+                schema=self.gate_schema,
+                schema_name="gatekeeper_result",
+            )
+
+    def extract(self, model: str, tier: str, user_text: str) -> dict[str, Any]:
+        start = time.perf_counter()
+        with span(f"analyst.{tier}"):
+            result = self.call(
+                client=self.client,
+                model=model,
+                system_prompt=self.alpha_prompt,
+                user_text=user_text,
+                schema=self.alpha_schema,
+                schema_name="alpha_object_v2",
+            )
+        self.stats.record_call(tier, time.perf_counter() - start)
+        return result
+
+    def analyst(
+        self, post_id: str, post_url: str, username: str, text: str
+    ) -> tuple[dict[str, Any], str, list[str]]:
+        """Return (alpha, model that produced it, escalation reasons)."""
+        analyst_input = (
+            f"POST_ID: {post_id}\nPOST_URL: {post_url}\nUSERNAME: {username}\nTEXT:\n{text}"
+        )
+        with span("analyst"):
+            alpha = self.extract(self.analyst_model, "fast", analyst_input)
+            model = self.analyst_model
+            # Checked before the guardrails, which would hide inconsistent levels.
+            reasons = self.policy.reasons(alpha, text) if self.escalation_model else []
+            self.stats.record_extraction(reasons)
+            if reasons and self.escalation_model:
+                alpha = self.extract(self.escalation_model, "strong", analyst_input)
+                model = self.escalation_model
+
+        alpha = ensure_origin_fields(alpha, post_id, post_url, username)
+        alpha = apply_missing_levels_guardrails(alpha, text)
+        return alpha, model, reasons
+
+
+def build_llm_stages(
     model_gatekeeper: str,
     model_analyst: str,
     prompt_dir: Path,
     schema_dir: Path,
-) -> int:
+    model_escalation: str | None = None,
+    escalation_policy: EscalationPolicy | None = None,
+    cascade_stats: CascadeStats | None = None,
+    with_client: bool = True,
+) -> LLMStages:
+    # Imported here so ingest/digest-only runs never pay for the OpenAI client import.
+    from dotenv import load_dotenv
+
+    from v0.llm import (
+        build_client,
+        load_prompt,
+        load_schema,
+        normalize_model_name,
+        structured_call,
+    )
+
     load_dotenv()
-    client = build_client()
     model_gatekeeper = normalize_model_name(model_gatekeeper)
     model_analyst = normalize_model_name(model_analyst)
-    gate_prompt = load_prompt(prompt_dir / "gatekeeper.md")
-    gate_schema = load_schema(schema_dir / "gatekeeper.schema.json")
-    alpha_prompt = load_prompt(prompt_dir / "analyst.md")
-    alpha_schema = load_schema(schema_dir / "alpha_object.schema.json")
+    if model_escalation:
+        model_escalation = normalize_model_name(model_escalation)
+
+    gate_paths = (prompt_dir / "gatekeeper.md", schema_dir / "gatekeeper.schema.json")
+    alpha_paths = (prompt_dir / "analyst.md", schema_dir / "alpha_object.schema.json")
+    analyst_models = [model_analyst] + ([model_escalation] if model_escalation else [])
+
+    return LLMStages(
+        # Dry runs only need the versions, so they skip the API key check.
+        client=build_client() if with_client else None,
+        call=structured_call,
+        gate_model=model_gatekeeper,
+        gate_prompt=load_prompt(gate_paths[0]),
+        gate_schema=load_schema(gate_paths[1]),
+        gate_version=stage_version(*gate_paths, model_gatekeeper),
+        analyst_model=model_analyst,
+        escalation_model=model_escalation,
+        alpha_prompt=load_prompt(alpha_paths[0]),
+        alpha_schema=load_schema(alpha_paths[1]),
+        analyst_versions={model: stage_version(*alpha_paths, model) for model in analyst_models},
+        policy=escalation_policy or EscalationPolicy(),
+        stats=cascade_stats if cascade_stats is not None else CascadeStats(),
+    )
+
+
+@traced("process")
+def process_posts(
+    conn,
+    model_gatekeeper: str,
+    model_analyst: str,
+    prompt_dir: Path,
+    schema_dir: Path,
+    use_rules: bool = True,
+    classifier_path: Path | None = None,
+    model_escalation: str | None = None,
+    escalation_policy: EscalationPolicy | None = None,
+    cascade_stats: CascadeStats | None = None,
+    audit_rate: float = DEFAULT_AUDIT_RATE,
+) -> int:
+    from v0.classifier import RelevanceModel
+
+    stages = build_llm_stages(
+        model_gatekeeper,
+        model_analyst,
+        prompt_dir,
+        schema_dir,
+        model_escalation=model_escalation,
+        escalation_policy=escalation_policy,
+        cascade_stats=cascade_stats,
+    )
+    classifier = (
+        RelevanceModel.load(classifier_path)
+        if classifier_path is not None and classifier_path.exists()
+        else None
+    )
 
     processed = 0
     for row in fetch_unprocessed(conn):
@@ -77,52 +247,55 @@ def process_posts(
         post_id = row["post_id"]
         post_url = row["url"] or ""
         username = row["username"] or ""
-        if not stage0_keep(text):
-            update_gatekeeper(conn, post_id, {"skipped": True, "reason": "stage0"})
+        with span("stage0"):
+            keep = stage0_keep(text)
+        if not keep:
+            update_gatekeeper(conn, post_id, {"skipped": True, "reason": "stage0"}, "stage0")
             continue
 
-        gate = structured_call(
-            client=client,
-            model=model_gatekeeper,
-            system_prompt=gate_prompt,
-            user_text=text,
-            schema=gate_schema,
-            schema_name="gatekeeper_result",
-        )
-        update_gatekeeper(conn, post_id, gate)
+        gate, source = None, "llm"
+        if audit_rate > 0 and audit_sample(post_id, audit_rate):
+            source = "audit"
+        else:
+            if use_rules:
+                with span("rules"):
+                    gate = rule_gatekeeper(text)
+            if gate is not None:
+                source = "rules"
+            elif classifier is not None:
+                with span("classifier"):
+                    route, _ = classifier.decide(text)
+                if route is not None:
+                    gate, source = classifier_gate(route, text), "classifier"
 
-        if not (
-            gate["is_finance_relevant"]
-            and (gate["is_actionable_trade_idea"] or gate["has_media_worth_processing"])
-        ):
+        if gate is None:
+            gate = stages.gatekeeper(text)
+            update_gatekeeper(conn, post_id, gate, source, stages.gate_version)
+        else:
+            update_gatekeeper(conn, post_id, gate, source)
+        if not gatekeeper_routes(gate):
             continue
 
-        analyst_input = (
-            f"POST_ID: {post_id}\nPOST_URL: {post_url}\nUSERNAME: {username}\nTEXT:\n{text}"
-        )
-
-        alpha = structured_call(
-            client=client,
-            model=model_analyst,
-            system_prompt=alpha_prompt,
-            user_text=analyst_input,
-            schema=alpha_schema,
-            schema_name="alpha_object_v2",
-        )
-
-        alpha = ensure_origin_fields(alpha, post_id, post_url, username)
-        alpha = apply_missing_levels_guardrails(alpha, text)
+        alpha, analyst_model, reasons = stages.analyst(post_id, post_url, username, text)
         created_at = (
             row["created_at"] or row["scraped_at"] or datetime.now(timezone.utc).isoformat()
         )
-        update_alpha(conn, post_id, alpha, created_at)
+        update_alpha(
+            conn,
+            post_id,
+            alpha,
+            created_at,
+            analyst_model,
+            reasons,
+            stages.analyst_versions[analyst_model],
+        )
         processed += 1
 
     return processed
 
 
 def apply_missing_levels_guardrails(alpha: dict[str, Any], text: str) -> dict[str, Any]:
-    if not re.search(r"\\b(entry|stop|target|tp|sl)\\b", text, re.IGNORECASE):
+    if not text_has_levels(text):
         key_levels = alpha.get("key_levels", {})
         key_levels["entry"] = None
         key_levels["invalidation"] = None
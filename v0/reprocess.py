@@ -0,0 +1,193 @@
+"""Selective re-extraction of rows whose prompt/schema/model version is stale."""
+
+import contextvars
+import json
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, TextIO
+
+from v0.db import (
+    decode_json,
+    delete_alpha,
+    fetch_stale_alpha,
+    fetch_stale_gatekeeper,
+    update_alpha,
+    update_gatekeeper,
+)
+from v0.pipeline import LLMStages, gatekeeper_routes
+from v0.trace import traced
+
+
+def diff_alpha(old: dict[str, Any] | None, new: dict[str, Any] | None) -> dict[str, Any]:
+    """Top-level fields that differ, as {field: {"old": ..., "new": ...}}."""
+    old, new = old or {}, new or {}
+    return {
+        key: {"old": old.get(key), "new": new.get(key)}
+        for key in sorted(set(old) | set(new))
+        if old.get(key) != new.get(key)
+    }
+
+
+@dataclass
+class ReprocessReport:
+    selected: int = 0
+    reextracted: int = 0
+    changed: int = 0
+    failed: int = 0
+    routing_changed: int = 0
+    field_changes: dict[str, int] = field(default_factory=dict)
+
+    def record_diff(self, changes: dict[str, Any]) -> None:
+        if changes:
+            self.changed += 1
+        for key in changes:
+            self.field_changes[key] = self.field_changes.get(key, 0) + 1
+
+    def format(self) -> str:
+        lines = [
+            f"Selected {self.selected} stale rows; re-extracted {self.reextracted}, "
+            f"{self.changed} changed, {self.failed} failed."
+        ]
+        if self.routing_changed:
+            lines.append(f"  gatekeeper routing changed for {self.routing_changed} posts")
+        if self.field_changes:
+            fields = ", ".join(f"{k}:{v}" for k, v in sorted(self.field_changes.items()))
+            lines.append(f"  changed fields: {fields}")
+        return "\n".join(lines)
+
+
+def _created_at(row: sqlite3.Row) -> str:
+    return row["created_at"] or row["scraped_at"] or datetime.now(timezone.utc).isoformat()
+
+
+def _gate_assets(row: sqlite3.Row) -> list[str]:
+    gate = decode_json(row["gatekeeper_json"]) or {}
+    return gate.get("primary_assets_detected") or []
+
+
+def _write_diff(handle: TextIO | None, post_id: str, stage: str, changes: dict) -> None:
+    if handle is not None and changes:
+        record = {"post_id": post_id, "stage": stage, "changes": changes}
+        handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def _run_analyst(
+    conn: sqlite3.Connection,
+    stages: LLMStages,
+    rows: list[sqlite3.Row],
+    workers: int,
+    report: ReprocessReport,
+    diff_handle: TextIO | None,
+) -> None:
+    """Re-extract alpha objects in parallel; DB writes stay on the calling thread."""
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            # Copy the context so worker spans nest under the current trace path.
+            pool.submit(
+                contextvars.copy_context().run,
+                stages.analyst,
+                row["post_id"],
+                row["url"] or "",
+                row["username"] or "",
+                row["text"] or "",
+            ): row
+            for row in rows
+        }
+        for future in as_completed(futures):
+            row = futures[future]
+            try:
+                alpha, analyst_model, reasons = future.result()
+            except Exception as err:
+                report.failed += 1
+                print(f"Analyst failed for {row['post_id']}: {err}")
+                continue
+            old = json.loads(row["alpha_json"]) if row["alpha_json"] else None
+            changes = diff_alpha(old, alpha)
+            report.reextracted += 1
+            report.record_diff(changes)
+            _write_diff(diff_handle, row["post_id"], "analyst", changes)
+            update_alpha(
+                conn,
+                row["post_id"],
+                alpha,
+                _created_at(row),
+                analyst_model,
+                reasons,
+                stages.analyst_versions[analyst_model],
+            )
+
+
+@traced("reprocess")
+def reprocess(
+    conn: sqlite3.Connection,
+    stages: LLMStages,
+    stage: str = "analyst",
+    since: str | None = None,
+    asset: str | None = None,
+    workers: int = 4,
+    dry_run: bool = False,
+    diff_out: Path | None = None,
+) -> ReprocessReport:
+    """Re-run the `analyst` or `gatekeeper` stage on rows stamped with an older version.
+
+    Gatekeeper reprocessing also re-extracts posts that become routed and drops
+    alpha objects for posts that no longer are.
+    """
+    report = ReprocessReport()
+    diff_handle = diff_out.open("w", encoding="utf-8") if diff_out and not dry_run else None
+    try:
+        if stage == "analyst":
+            rows = fetch_stale_alpha(conn, list(stages.analyst_versions.values()), since, asset)
+            report.selected = len(rows)
+            if not dry_run:
+                _run_analyst(conn, stages, rows, workers, report, diff_handle)
+            return report
+
+        rows = fetch_stale_gatekeeper(conn, stages.gate_version, since)
+        if asset is not None:
+            rows = [row for row in rows if asset in _gate_assets(row)]
+        report.selected = len(rows)
+        if dry_run:
+            return report
+
+        to_extract = []
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(
+                    contextvars.copy_context().run, stages.gatekeeper, row["text"] or ""
+                ): row
+                for row in rows
+            }
+            for future in as_completed(futures):
+                row = futures[future]
+                try:
+                    gate = future.result()
+                except Exception as err:
+                    report.failed += 1
+                    print(f"Gatekeeper failed for {row['post_id']}: {err}")
+                    continue
+                old_gate = decode_json(row["gatekeeper_json"])
+                changes = diff_alpha(old_gate, gate)
+                report.reextracted += 1
+                report.record_diff(changes)
+                _write_diff(diff_handle, row["post_id"], "gatekeeper", changes)
+                update_gatekeeper(
+                    conn, row["post_id"], gate, row["gatekeeper_source"], stages.gate_version
+                )
+
+                routes = gatekeeper_routes(gate)
+                if routes != gatekeeper_routes(old_gate or {}):
+                    report.routing_changed += 1
+                if routes and row["alpha_json"] is None:
+                    to_extract.append(row)
+                elif not routes and row["alpha_json"] is not None:
+                    delete_alpha(conn, row["post_id"])
+
+        _run_analyst(conn, stages, to_extract, workers, report, diff_handle)
+        return report
+    finally:
+        if diff_handle is not None:
+            diff_handle.close()
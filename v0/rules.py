@@ -0,0 +1,117 @@
+"""Deterministic pre-gatekeeper for posts whose routing is not in doubt."""
+
+import random
+import re
+import sqlite3
+from typing import Any
+
+from v0.db import count_gatekeeper_sources, fetch_llm_gatekeeper_labels
+
+# Known non-single-name tickers; any other cashtag is treated as `single_name`.
+TICKER_LEXICON: dict[str, str] = {
+    **dict.fromkeys(
+        ["BTC", "ETH", "SOL", "XRP", "DOGE", "ADA", "AVAX", "LINK", "BNB", "LTC", "DOT"],
+        "crypto",
+    ),
+    **dict.fromkeys(["TLT", "TBT", "IEF", "SHY", "ZN", "ZB", "ZF", "ZT", "TMF", "HYG"], "rates"),
+    **dict.fromkeys(["SPY", "QQQ", "IWM", "DIA", "ES", "NQ", "RTY", "DXY", "VIX", "UVXY"], "macro"),
+    **dict.fromkeys(
+        ["XLE", "XLF", "XLK", "XLV", "XLI", "XLU", "XLY", "XLP", "XLB", "SMH", "KRE", "XBI"],
+        "sector",
+    ),
+}
+
+CASHTAG_RE = re.compile(r"(?<![\w$])\$([A-Za-z]{1,6}(?:\.[A-Za-z]{1,2})?)\b")
+BULLISH_RE = re.compile(r"\b(long|buy|buying|bullish|calls)\b", re.IGNORECASE)
+BEARISH_RE = re.compile(r"\b(short|sell|selling|bearish|puts)\b", re.IGNORECASE)
+LEVEL_RE = re.compile(
+    r"\b(entry|stop(?: loss)?|sl|target|tgt|tp|pt)\b[\s:@-]*\$?\d+(?:\.\d+)?", re.IGNORECASE
+)
+# Questions, hedges and negations make the stance debatable; leave those to the model.
+HEDGE_RE = re.compile(
+    r"\?|\b(not|no|don't|dont|never|if|maybe|might|would|should)\b", re.IGNORECASE
+)
+
+
+def extract_cashtags(text: str) -> list[str]:
+    return list(dict.fromkeys(match.upper() for match in CASHTAG_RE.findall(text or "")))
+
+
+def reason_code_for(tickers: list[str]) -> str | None:
+    codes = {TICKER_LEXICON.get(ticker, "single_name") for ticker in tickers}
+    return codes.pop() if len(codes) == 1 else None
+
+
+def rule_gatekeeper(text: str) -> dict[str, Any] | None:
+    """Return a GatekeeperResult when cashtags, stance and levels make it certain, else None."""
+    tickers = extract_cashtags(text)
+    if not tickers or HEDGE_RE.search(text):
+        return None
+    if bool(BULLISH_RE.search(text)) == bool(BEARISH_RE.search(text)):
+        return None
+    if not LEVEL_RE.search(text):
+        return None
+    reason_code = reason_code_for(tickers)
+    if reason_code is None:
+        return None
+    return {
+        "is_finance_relevant": True,
+        "is_actionable_trade_idea": True,
+        "has_media_worth_processing": False,
+        "primary_assets_detected": tickers,
+        "reason_code": reason_code,
+    }
+
+
+def evaluate_rules(
+    conn: sqlite3.Connection, sample_size: int = 500, seed: int = 0
+) -> dict[str, Any]:
+    """Report how often the rules decide in production, and how well they agree with the LLM.
+
+    The production rate comes from the stored gatekeeper sources. Agreement is measured by
+    replaying the rules over a sample of LLM labels the rules never saw: the `audit`
+    stream, else posts labelled before the rules existed. Plain `llm` rows are the posts
+    the rules already declined, so they are only used as a last resort.
+    """
+    produced = count_gatekeeper_sources(conn)
+    # Stage0 drops happen before the rules; every other source passed through them.
+    eligible = sum(count for source, count in produced.items() if source not in ("stage0", None))
+
+    rows = fetch_llm_gatekeeper_labels(conn)
+    for sample_source in ("audit", None, "llm"):
+        pool = [row for row in rows if row["source"] == sample_source]
+        if pool:
+            break
+    sample = random.Random(seed).sample(pool, min(sample_size, len(pool)))
+
+    fired = 0
+    routing_agree = 0
+    assets_agree = 0
+    reason_agree = 0
+    for row in sample:
+        rule = rule_gatekeeper(row["text"] or "")
+        if rule is None:
+            continue
+        fired += 1
+        llm = row["gatekeeper"]
+        llm_routes = llm.get("is_finance_relevant") and llm.get("is_actionable_trade_idea")
+        if llm_routes:
+            routing_agree += 1
+        llm_assets = {asset.lstrip("$").upper() for asset in llm.get("primary_assets_detected", [])}
+        if set(rule["primary_assets_detected"]) <= llm_assets:
+            assets_agree += 1
+        if rule["reason_code"] == llm.get("reason_code"):
+            reason_agree += 1
+
+    return {
+        "produced": {source or "pre_rules": count for source, count in produced.items()},
+        "short_circuit_rate": produced.get("rules", 0) / eligible if eligible else 0.0,
+        "labelled": len(rows),
+        "sample_source": sample_source or "pre_rules",
+        "sampled": len(sample),
+        "short_circuited": fired,
+        "replay_short_circuit_rate": fired / len(sample) if sample else 0.0,
+        "routing_agreement": routing_agree / fired if fired else None,
+        "asset_agreement": assets_agree / fired if fired else None,
+        "reason_code_agreement": reason_agree / fired if fired else None,
+    }
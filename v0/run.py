@@ -1,44 +1,360 @@
 import argparse
+import json
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from typing import Any
 
+from v0 import trace
+from v0.cascade import ESCALATION_TRIGGERS, CascadeStats, EscalationPolicy
 from v0.db import connect, init_db
-from v0.digest import write_digest
-from v0.pipeline import ingest_jsonl, process_posts
+from v0.pipeline import DEFAULT_AUDIT_RATE, ingest_jsonl, process_posts
 
 
-def main() -> None:
+def shared_default(value: Any, subcommand: bool) -> Any:
+    # Subcommands repeat the top-level options. Without SUPPRESS their defaults would
+    # overwrite values given before the subcommand, e.g. `v0.run --db x.db digest`.
+    return argparse.SUPPRESS if subcommand else value
+
+
+def add_db_args(parser: argparse.ArgumentParser, subcommand: bool = False) -> None:
+    parser.add_argument(
+        "--db", default=shared_default("data/alpha.db", subcommand), help="SQLite DB path."
+    )
+
+
+def add_trace_args(parser: argparse.ArgumentParser, subcommand: bool = False) -> None:
+    parser.add_argument(
+        "--trace-out",
+        default=shared_default(None, subcommand),
+        help="Write the per-stage timing breakdown as JSON.",
+    )
+    parser.add_argument(
+        "--profile",
+        action="append",
+        default=shared_default([], subcommand),
+        metavar="STAGE",
+        help="Run a stage (e.g. process, analyst, digest) under cProfile; repeatable.",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        default=shared_default("data/profiles", subcommand),
+        help="Where .prof files go.",
+    )
+    parser.set_defaults(traced=True)
+
+
+def add_ingest_args(parser: argparse.ArgumentParser, subcommand: bool = False) -> None:
+    parser.add_argument(
+        "--input",
+        default=shared_default("data/x_posts.jsonl", subcommand),
+        help="Input JSONL file.",
+    )
+
+
+def add_llm_args(parser: argparse.ArgumentParser, subcommand: bool = False) -> None:
+    parser.add_argument(
+        "--prompt-dir", default=shared_default("prompts", subcommand), help="Prompt directory."
+    )
+    parser.add_argument(
+        "--schema-dir", default=shared_default("schemas", subcommand), help="Schema directory."
+    )
+    parser.add_argument("--gatekeeper-model", default=shared_default("gpt-4o-mini", subcommand))
+    parser.add_argument(
+        "--analyst-model",
+        default=shared_default("gpt-4o-mini", subcommand),
+        help="Fast analyst tier.",
+    )
+    parser.add_argument(
+        "--analyst-escalation-model",
+        default=shared_default(None, subcommand),
+        help="Stronger analyst tier for outputs flagged by --escalate-on; no cascade if unset.",
+    )
+    parser.add_argument(
+        "--escalate-on",
+        default=shared_default(",".join(ESCALATION_TRIGGERS), subcommand),
+        help=f"Comma-separated escalation triggers from: {', '.join(ESCALATION_TRIGGERS)}.",
+    )
+    parser.add_argument(
+        "--escalate-confidence",
+        choices=["low", "medium", "high"],
+        default=shared_default("low", subcommand),
+        help="low_confidence fires when extraction_confidence is at or below this level.",
+    )
+    parser.add_argument(
+        "--no-rules",
+        action="store_true",
+        default=shared_default(False, subcommand),
+        help="Send every stage0-passing post to the LLM gatekeeper.",
+    )
+    parser.add_argument(
+        "--classifier",
+        default=shared_default("data/relevance_model.npz", subcommand),
+        help="Relevance model from `train-classifier`; ignored if missing.",
+    )
+    parser.add_argument(
+        "--no-classifier", action="store_true", default=shared_default(False, subcommand)
+    )
+    parser.add_argument(
+        "--audit-rate",
+        type=float,
+        default=shared_default(DEFAULT_AUDIT_RATE, subcommand),
+        help="Share of posts sent to the LLM gatekeeper regardless of rules and classifier.",
+    )
+
+
+def add_digest_args(parser: argparse.ArgumentParser, subcommand: bool = False) -> None:
+    parser.add_argument("--digest-hours", type=int, default=shared_default(12, subcommand))
+    parser.add_argument("--digest-out", default=shared_default("digest.md", subcommand))
+
+
+def run_ingest(conn, args: argparse.Namespace) -> None:
+    inserted = ingest_jsonl(conn, Path(args.input))
+    print(f"Inserted {inserted} posts.")
+
+
+def escalation_policy(args: argparse.Namespace) -> EscalationPolicy:
+    triggers = tuple(t.strip() for t in args.escalate_on.split(",") if t.strip())
+    unknown = set(triggers) - set(ESCALATION_TRIGGERS)
+    if unknown:
+        raise SystemExit(f"Unknown --escalate-on triggers: {', '.join(sorted(unknown))}")
+    return EscalationPolicy(triggers=triggers, max_confidence=args.escalate_confidence)
+
+
+def run_process(conn, args: argparse.Namespace) -> None:
+    policy = escalation_policy(args)
+    stats = CascadeStats()
+    processed = process_posts(
+        conn,
+        model_gatekeeper=args.gatekeeper_model,
+        model_analyst=args.analyst_model,
+        prompt_dir=Path(args.prompt_dir),
+        schema_dir=Path(args.schema_dir),
+        use_rules=not args.no_rules,
+        classifier_path=None if args.no_classifier else Path(args.classifier),
+        model_escalation=args.analyst_escalation_model,
+        escalation_policy=policy,
+        cascade_stats=stats,
+        audit_rate=args.audit_rate,
+    )
+    print(f"Processed {processed} posts with LLM.")
+    if args.analyst_escalation_model:
+        print(stats.format())
+
+
+def run_reprocess(conn, args: argparse.Namespace) -> None:
+    from v0.pipeline import build_llm_stages
+    from v0.reprocess import reprocess
+
+    since = args.since
+    if args.since_hours is not None:
+        since = (datetime.now(timezone.utc) - timedelta(hours=args.since_hours)).isoformat()
+    stats = CascadeStats()
+    stages = build_llm_stages(
+        model_gatekeeper=args.gatekeeper_model,
+        model_analyst=args.analyst_model,
+        prompt_dir=Path(args.prompt_dir),
+        schema_dir=Path(args.schema_dir),
+        model_escalation=args.analyst_escalation_model,
+        escalation_policy=escalation_policy(args),
+        cascade_stats=stats,
+        with_client=not args.dry_run,
+    )
+    report = reprocess(
+        conn,
+        stages,
+        stage=args.stage,
+        since=since,
+        asset=args.asset,
+        workers=args.workers,
+        dry_run=args.dry_run,
+        diff_out=Path(args.diff_out) if args.diff_out else None,
+    )
+    if args.dry_run:
+        print(f"Would reprocess {report.selected} {args.stage} rows (dry run).")
+        return
+    print(report.format())
+    if args.diff_out:
+        print(f"Wrote diffs to {args.diff_out}.")
+    if args.analyst_escalation_model:
+        print(stats.format())
+
+
+def run_train_classifier(conn, args: argparse.Namespace) -> None:
+    from v0.classifier import train_from_db
+
+    report = train_from_db(
+        conn,
+        model_path=Path(args.model_out),
+        holdout=args.holdout,
+        target_precision=args.target_precision,
+        min_support=args.min_support,
+        seed=args.seed,
+    )
+    print(json.dumps(report, indent=2))
+
+
+def run_compact(conn, args: argparse.Namespace) -> None:
+    from v0.archive import compact_db
+
+    rewritten = compact_db(conn, vacuum=not args.no_vacuum)
+    print(f"Compacted {rewritten} rows.")
+
+
+def run_archive(conn, args: argparse.Namespace) -> None:
+    from v0.archive import archive_rows
+
+    moved = archive_rows(conn, Path(args.archive_dir), retention_days=args.retention_days)
+    for month, count in moved.items():
+        print(f"Archived {count} posts to {args.archive_dir}/alpha-{month}.db.")
+    print(f"Archived {sum(moved.values())} posts.")
+
+
+def run_serve(conn, args: argparse.Namespace) -> None:
+    from v0.server import serve
+
+    conn.close()
+    serve(args.db, host=args.host, port=args.port, cache_size=args.cache_size)
+
+
+def run_gatekeeper_report(conn, args: argparse.Namespace) -> None:
+    from v0.rules import evaluate_rules
+
+    report = evaluate_rules(conn, sample_size=args.sample_size, seed=args.seed)
+    print(json.dumps(report, indent=2))
+
+
+def run_digest(conn, args: argparse.Namespace) -> None:
+    # Deferred so ingest-only runs skip the NumPy import pulled in by the aggregator.
+    from v0.digest import write_digest
+
+    write_digest(args.digest_out, hours=args.digest_hours, db_path=args.db)
+    print(f"Wrote digest to {args.digest_out}.")
+
+
+def run_all(conn, args: argparse.Namespace) -> None:
+    if not args.skip_ingest:
+        run_ingest(conn, args)
+    if not args.skip_llm:
+        run_process(conn, args)
+    run_digest(conn, args)
+
+
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Run v0 trade-ideas pipeline.")
-    parser.add_argument("--input", default="data/x_posts.jsonl", help="Input JSONL file.")
-    parser.add_argument("--db", default="data/alpha.db", help="SQLite DB path.")
-    parser.add_argument("--prompt-dir", default="prompts", help="Prompt directory.")
-    parser.add_argument("--schema-dir", default="schemas", help="Schema directory.")
-    parser.add_argument("--gatekeeper-model", default="gpt-4o-mini")
-    parser.add_argument("--analyst-model", default="gpt-4o-mini")
-    parser.add_argument("--digest-hours", type=int, default=12)
-    parser.add_argument("--digest-out", default="digest.md")
+    add_db_args(parser)
+    add_trace_args(parser)
+    add_ingest_args(parser)
+    add_llm_args(parser)
+    add_digest_args(parser)
     parser.add_argument("--skip-ingest", action="store_true")
     parser.add_argument("--skip-llm", action="store_true")
-    args = parser.parse_args()
+    parser.set_defaults(handler=run_all)
+
+    subparsers = parser.add_subparsers(dest="command")
+
+    ingest = subparsers.add_parser("ingest", help="Load a JSONL file into the DB only.")
+    add_db_args(ingest, subcommand=True)
+    add_trace_args(ingest, subcommand=True)
+    add_ingest_args(ingest, subcommand=True)
+    ingest.set_defaults(handler=run_ingest)
+
+    process = subparsers.add_parser("process", help="Run the LLM stages on unprocessed posts.")
+    add_db_args(process, subcommand=True)
+    add_trace_args(process, subcommand=True)
+    add_llm_args(process, subcommand=True)
+    process.set_defaults(handler=run_process)
+
+    digest = subparsers.add_parser("digest", help="Render the digest from the DB only.")
+    add_db_args(digest, subcommand=True)
+    add_trace_args(digest, subcommand=True)
+    add_digest_args(digest, subcommand=True)
+    digest.set_defaults(handler=run_digest)
+
+    reprocess = subparsers.add_parser(
+        "reprocess",
+        help="Re-run an LLM stage on rows produced by an older prompt, schema or model.",
+    )
+    add_db_args(reprocess, subcommand=True)
+    add_trace_args(reprocess, subcommand=True)
+    add_llm_args(reprocess, subcommand=True)
+    reprocess.add_argument("--stage", choices=["analyst", "gatekeeper"], default="analyst")
+    since = reprocess.add_mutually_exclusive_group()
+    since.add_argument("--since", help="Only posts created at or after this ISO timestamp.")
+    since.add_argument("--since-hours", type=int, help="Only posts from the last N hours.")
+    reprocess.add_argument("--asset", help="Only posts mentioning this asset, e.g. AAPL.")
+    reprocess.add_argument("--workers", type=int, default=4, help="Concurrent LLM calls.")
+    reprocess.add_argument("--dry-run", action="store_true", help="Count stale rows only.")
+    reprocess.add_argument("--diff-out", help="Write per-post field diffs as JSONL.")
+    reprocess.set_defaults(handler=run_reprocess)
+
+    server = subparsers.add_parser("serve", help="Serve cached digests over HTTP.")
+    add_db_args(server, subcommand=True)
+    server.add_argument("--host", default="127.0.0.1")
+    server.add_argument("--port", type=int, default=8080)
+    server.add_argument("--cache-size", type=int, default=256, help="Rendered digests to keep.")
+    server.set_defaults(handler=run_serve, traced=False)
+
+    report = subparsers.add_parser(
+        "gatekeeper-report",
+        help="Compare the rule gatekeeper against stored LLM labels.",
+    )
+    add_db_args(report, subcommand=True)
+    report.add_argument("--sample-size", type=int, default=500)
+    report.add_argument("--seed", type=int, default=0)
+    report.set_defaults(handler=run_gatekeeper_report, traced=False)
+
+    train = subparsers.add_parser(
+        "train-classifier",
+        help="Train the local relevance classifier on stored LLM gatekeeper labels.",
+    )
+    add_db_args(train, subcommand=True)
+    train.add_argument("--model-out", default="data/relevance_model.npz")
+    train.add_argument("--holdout", type=float, default=0.2)
+    train.add_argument(
+        "--target-precision",
+        type=float,
+        default=0.98,
+        help="Held-out precision required before a score band may skip the LLM.",
+    )
+    train.add_argument("--min-support", type=int, default=20)
+    train.add_argument("--seed", type=int, default=0)
+    train.set_defaults(handler=run_train_classifier, traced=False)
+
+    compact = subparsers.add_parser(
+        "compact", help="Compress legacy JSON columns in place and VACUUM."
+    )
+    add_db_args(compact, subcommand=True)
+    compact.add_argument("--no-vacuum", action="store_true")
+    compact.set_defaults(handler=run_compact, traced=False)
+
+    archive = subparsers.add_parser(
+        "archive", help="Move posts past the retention window into monthly cold DBs."
+    )
+    add_db_args(archive, subcommand=True)
+    archive.add_argument("--archive-dir", default="data/archive")
+    archive.add_argument("--retention-days", type=int, default=90)
+    archive.set_defaults(handler=run_archive, traced=False)
+
+    return parser
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+
+    if args.traced:
+        trace.enable_profiling(args.profile)
 
     conn = connect(args.db)
     init_db(conn)
+    args.handler(conn, args)
 
-    if not args.skip_ingest:
-        inserted = ingest_jsonl(conn, Path(args.input))
-        print(f"Inserted {inserted} posts.")
-
-    if not args.skip_llm:
-        processed = process_posts(
-            conn,
-            model_gatekeeper=args.gatekeeper_model,
-            model_analyst=args.analyst_model,
-            prompt_dir=Path(args.prompt_dir),
-            schema_dir=Path(args.schema_dir),
-        )
-        print(f"Processed {processed} posts with LLM.")
-
-    write_digest(args.digest_out, hours=args.digest_hours)
-    print(f"Wrote digest to {args.digest_out}.")
+    if args.traced:
+        print(trace.format_summary())
+        if args.trace_out:
+            trace.export_json(Path(args.trace_out))
+            print(f"Wrote timings to {args.trace_out}.")
+        for path in trace.dump_profiles(Path(args.profile_dir)):
+            print(f"Wrote profile to {path} (inspect with `python -m pstats {path}`).")
 
 
 if __name__ == "__main__":
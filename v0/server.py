@@ -0,0 +1,165 @@
+"""Local HTTP service for rendered digests.
+
+Endpoints:
+  GET /digest.md?hours=12&asset=AAPL
+  GET /digest.json?hours=12&asset=AAPL
+  GET /healthz
+
+Rendered bodies are kept in an in-process LRU keyed by the request and the
+trigger-maintained insert/delete counters of `alpha_objects`, so any write
+invalidates every cached digest at O(1) cost per lookup. Cache hits never wait on
+a render. The ETag is a hash of the body, so it only changes when the digest does;
+a matching If-None-Match gets 304.
+"""
+
+import hashlib
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from v0.aggregate import AggregationEngine
+from v0.db import alpha_changes, connect, init_db
+from v0.digest import collect_digest, render_json, render_markdown
+
+CONTENT_TYPES = {
+    "md": "text/markdown; charset=utf-8",
+    "json": "application/json",
+}
+# Longer windows overflow datetime arithmetic and exceed any retention we keep.
+MAX_HOURS = 24 * 366
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header (`*`, lists, `W/` tags) against `etag`."""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+
+class DigestCache:
+    """Renders digests from one shared connection and keeps the newest `max_entries`."""
+
+    def __init__(self, db_path: str, max_entries: int = 256, resolution_seconds: int = 60):
+        self.conn = connect(db_path, check_same_thread=False)
+        init_db(self.conn)
+        # Lookups read the change counters on their own connection, so they never
+        # contend with the render connection.
+        self.state_conn = connect(db_path, check_same_thread=False)
+        self.engine = AggregationEngine(self.conn, resolution_seconds=resolution_seconds)
+        self.max_entries = max_entries
+        self.resolution_seconds = resolution_seconds
+        self.entries: OrderedDict[tuple, tuple[str, bytes]] = OrderedDict()
+        # `lock` guards the entries, counters and state_conn and is only held briefly;
+        # `render_lock` serializes renders on the shared connection and engine.
+        self.lock = threading.Lock()
+        self.render_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, key: tuple) -> tuple[str, bytes] | None:
+        with self.lock:
+            cached = self.entries.get(key)
+            if cached is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+            return cached
+
+    def get(self, fmt: str, hours: int, asset: str | None) -> tuple[str, bytes]:
+        """Return (etag, body) for a digest, rendering it only on a cache miss."""
+        # The window's cutoff moves with the clock, so entries also expire per time bucket.
+        bucket = math.floor(time.time() / self.resolution_seconds)
+        with self.lock:
+            changes = alpha_changes(self.state_conn)
+        key = (fmt, hours, asset, changes, bucket)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+
+        with self.render_lock:
+            # Concurrent misses for one key queue here; only the first renders.
+            cached = self._lookup(key)
+            if cached is not None:
+                return cached
+            groups = collect_digest(self.conn, hours, engine=self.engine, asset=asset)
+            if fmt == "json":
+                body = json.dumps(render_json(hours, groups), ensure_ascii=False).encode("utf-8")
+            else:
+                body = render_markdown(hours, groups).encode("utf-8")
+            etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+
+            with self.lock:
+                self.misses += 1
+                self.entries[key] = (etag, body)
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+            return etag, body
+
+
+def make_handler(cache: DigestCache) -> type[BaseHTTPRequestHandler]:
+    class DigestHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:
+            url = urlsplit(self.path)
+            if url.path == "/healthz":
+                health = {"ok": True, "hits": cache.hits, "misses": cache.misses}
+                self.respond(200, json.dumps(health).encode("utf-8"), CONTENT_TYPES["json"])
+                return
+
+            fmt = {"/digest.md": "md", "/digest.json": "json"}.get(url.path)
+            if fmt is None:
+                self.respond(404, b"not found\n", "text/plain")
+                return
+
+            query = parse_qs(url.query)
+            try:
+                hours = int(query.get("hours", ["12"])[0])
+            except ValueError:
+                self.respond(400, b"hours must be an integer\n", "text/plain")
+                return
+            if not 0 < hours <= MAX_HOURS:
+                self.respond(400, f"hours must be 1..{MAX_HOURS}\n".encode(), "text/plain")
+                return
+            asset = query.get("asset", [None])[0]
+
+            etag, body = cache.get(fmt, hours, asset)
+            if etag_matches(self.headers.get("If-None-Match"), etag):
+                self.respond(304, b"", CONTENT_TYPES[fmt], etag)
+                return
+            self.respond(200, body, CONTENT_TYPES[fmt], etag)
+
+        def respond(
+            self, status: int, body: bytes, content_type: str, etag: str | None = None
+        ) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            if status != 304:
+                self.send_header("Content-Length", str(len(body)))
+            if etag:
+                self.send_header("ETag", etag)
+                self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            if status != 304:
+                self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:
+            pass
+
+    return DigestHandler
+
+
+def serve(db_path: str, host: str = "127.0.0.1", port: int = 8080, cache_size: int = 256) -> None:
+    cache = DigestCache(db_path, max_entries=cache_size)
+    server = ThreadingHTTPServer((host, port), make_handler(cache))
+    print(f"Serving digests from {db_path} on http://{host}:{port}/digest.md")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
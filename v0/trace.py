@@ -0,0 +1,134 @@
+"""Lightweight nested timing spans with optional cProfile capture.
+
+Spans are aggregated by their path (e.g. `process/analyst/db.update_alpha`), so a
+run records one row per distinct call site rather than one per call.
+"""
+
+import contextvars
+import cProfile
+import functools
+import json
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_current_path: contextvars.ContextVar[str] = contextvars.ContextVar("trace_path", default="")
+_lock = threading.Lock()
+_stats: dict[str, list[float]] = {}  # path -> [count, total, max]
+_profile_stages: set[str] = set()
+_profiles: dict[str, cProfile.Profile] = {}
+# Held by the span that is profiling. cProfile allows one active profiler (process-wide
+# from Python 3.12), so nested stages fold into the outer profile and spans on other
+# threads run unprofiled meanwhile.
+_profiling = threading.Lock()
+_started = time.perf_counter()
+
+
+def reset() -> None:
+    global _started
+    with _lock:
+        _stats.clear()
+        _profiles.clear()
+        _started = time.perf_counter()
+
+
+def enable_profiling(stages: Iterable[str]) -> None:
+    """Wrap every span whose name is in `stages` in a (per-stage, cumulative) cProfile."""
+    _profile_stages.update(stages)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    parent = _current_path.get()
+    path = f"{parent}/{name}" if parent else name
+    token = _current_path.set(path)
+
+    profile = None
+    if name in _profile_stages and _profiling.acquire(blocking=False):
+        with _lock:
+            profile = _profiles.setdefault(name, cProfile.Profile())
+        try:
+            profile.enable()
+        except ValueError:  # another profiler (e.g. `python -m cProfile`) is active
+            _profiling.release()
+            profile = None
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        if profile is not None:
+            profile.disable()
+            _profiling.release()
+        _current_path.reset(token)
+        with _lock:
+            entry = _stats.setdefault(path, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += elapsed
+            entry[2] = max(entry[2], elapsed)
+
+
+def traced(name: str) -> Callable[[F], F]:
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(name):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def summary() -> dict[str, Any]:
+    with _lock:
+        spans = [
+            {
+                "name": path,
+                "count": int(count),
+                "total_ms": round(total * 1000, 3),
+                "mean_ms": round(total * 1000 / count, 3),
+                "max_ms": round(peak * 1000, 3),
+            }
+            for path, (count, total, peak) in sorted(_stats.items())
+        ]
+    return {"wall_ms": round((time.perf_counter() - _started) * 1000, 3), "spans": spans}
+
+
+def format_summary(data: dict[str, Any] | None = None) -> str:
+    data = data or summary()
+    lines = [f"{'span':<48} {'count':>7} {'total ms':>11} {'mean ms':>10} {'max ms':>10}"]
+    for entry in data["spans"]:
+        depth = entry["name"].count("/")
+        label = "  " * depth + entry["name"].rsplit("/", 1)[-1]
+        lines.append(
+            f"{label:<48} {entry['count']:>7} {entry['total_ms']:>11.1f} "
+            f"{entry['mean_ms']:>10.2f} {entry['max_ms']:>10.1f}"
+        )
+    lines.append(f"{'wall':<48} {'':>7} {data['wall_ms']:>11.1f}")
+    return "\n".join(lines)
+
+
+def export_json(path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(summary(), indent=2), encoding="utf-8")
+
+
+def dump_profiles(profile_dir: Path) -> list[Path]:
+    with _lock:
+        profiles = list(_profiles.items())
+    if not profiles:
+        return []
+    profile_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+    for name, profile in profiles:
+        out = profile_dir / f"{name}.prof"
+        profile.dump_stats(str(out))
+        written.append(out)
+    return written